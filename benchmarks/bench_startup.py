@@ -0,0 +1,44 @@
+"""
+Cold start benchmark for the spotify2youtube entry point.
+
+    python benchmarks/bench_startup.py --runs 5
+
+Spawns a fresh interpreter for every run and reports the median wall time of
+`python -m spotify2youtube <command> --help` and of importing each subcommand
+module, so a heavy import creeping into a shared module shows up here.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMMANDS = [[], ["sync"], ["dedupe"], ["cast"]]
+MODULES = ["spotify2youtube.sync", "spotify2youtube.batch", "spotify2youtube.dedupe", "spotify2youtube.cast"]
+
+
+def median_time(cmd, runs):
+    times = []
+    for i in range(runs):
+        started = time.perf_counter()
+        subprocess.run(cmd, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - started)
+    return round(statistics.median(times), 3)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(json.dumps({"target": "python", "seconds": median_time([sys.executable, "-c", "pass"], args.runs)}))
+    for command in COMMANDS:
+        cmd = [sys.executable, "-m", "spotify2youtube", *command, "--help"]
+        print(json.dumps({"target": " ".join(["spotify2youtube", *command, "--help"]),
+                          "seconds": median_time(cmd, args.runs)}))
+    for module in MODULES:
+        cmd = [sys.executable, "-c", f"import {module}"]
+        print(json.dumps({"target": f"import {module}", "seconds": median_time(cmd, args.runs)}))
@@ -0,0 +1,150 @@
+"""
+End-to-end sync benchmark against the offline fakes in fake_api.py.
+
+    python benchmarks/bench_sync.py --sizes 100 1000 10000 --latency 0.01
+
+For every playlist size it runs an initial sync into an empty YouTube account,
+then an incremental sync after 10% of the Spotify playlist was replaced, then
+one after 10% of the tracks were relinked to new Spotify ids, and
+prints wall time, time to the first insert, time per stage, request counts and
+quota units per run as JSON lines (and peak memory with --memory). With
+--clients N the searches are fanned out over N fake clients. Quota is charged
+to a scratch ledger in the temporary working directory, never to the real one.
+With --http the fake YouTube API is served on localhost (fake_server.py) and
+synced through real googleapiclient clients on the pooled transport, which
+adds the TCP connections opened to the output.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_api import FakeSpotify, FakeYouTube
+from fake_server import FakeYouTubeServer
+from spotify2youtube import api, metrics
+from spotify2youtube.quota import QuotaExceeded, ledger
+from spotify2youtube.match_cache import MatchCache
+from spotify2youtube.sync import get_playlist, iter_tracks, sync
+
+CHANGED_FRACTION = 0.1
+SERVERS = []    # FakeYouTubeServers of the running benchmark, with --http
+
+
+def run_sync(sp, clients, fakes, cache, trace_memory=False, fan_out=False):
+    """
+    :param clients: client index -> API client passed to sync, the first one syncs
+    :param fakes: client index -> FakeYouTube serving that client, for its counters
+    """
+    for fake in fakes.values():
+        fake.requests.clear()
+        fake.units.clear()
+        fake.first_call.clear()
+    sp.requests = 0
+    stages_before = metrics.snapshot()["stages"]
+    connections_before = sum(server.connections for server in SERVERS)
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    youtube = next(iter(clients.values()))
+    with contextlib.redirect_stdout(io.StringIO()):
+        spotify_playlist, spotify_username, snapshot_id = get_playlist(sp, "spotify:playlist:bench")
+        while youtube is not None:
+            try:
+                search_clients = None
+                if fan_out:
+                    search_clients = {client: clients[client] for client in ledger.available_clients()
+                                      if client in clients}
+                sync(youtube, iter_tracks(sp, "spotify:playlist:bench"), spotify_username, spotify_playlist, cache,
+                     resume=True, search_clients=search_clients)
+                break
+            except QuotaExceeded:
+                # rotate to the next client like sync.run
+                youtube = next((clients[client] for client in ledger.available_clients() if client in clients), None)
+    wall_time = time.perf_counter() - started
+    peak_memory = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    tracemalloc.stop()
+    first_insert = min((fake.first_call["playlistItems.insert"] for fake in fakes.values()
+                        if "playlistItems.insert" in fake.first_call), default=None)
+    stages = {name: round(values["seconds"] - stages_before.get(name, {"seconds": 0})["seconds"], 3)
+              for name, values in metrics.snapshot()["stages"].items()}
+    return {
+        "wall_time": round(wall_time, 3),
+        "first_insert": round(first_insert - started, 3) if first_insert else None,
+        "peak_memory_mb": round(peak_memory / 2 ** 20, 1) if trace_memory else None,
+        "stages": stages,
+        "spotify_requests": sp.requests,
+        "youtube_requests": sum(sum(fake.requests.values()) for fake in fakes.values()),
+        "connections": sum(server.connections for server in SERVERS) - connections_before if SERVERS else None,
+        "quota_units": sum(fake.total_units for fake in fakes.values()),
+        "requests": dict(sum((fake.requests for fake in fakes.values()), Counter())),
+        "units": dict(sum((fake.units for fake in fakes.values()), Counter())),
+        "units_by_client": {client: fake.total_units for client, fake in fakes.items()} if fan_out else None,
+    }
+
+
+def bench(size, latency, error_rate, trace_memory=False, clients=0, http=False):
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            # fake client secrets, so the ledger sees the clients as configured
+            os.makedirs("client_secrets")
+            for client in range(max(clients, 1)):
+                with open(f"client_secrets/CLIENT_SECRET{client}.json", "w") as secret_file:
+                    secret_file.write("{}")
+            ledger.load(os.path.join(workdir, "client_secrets", "quota_ledger.json"))
+            sp = FakeSpotify(size, latency=latency)
+            youtube = FakeYouTube(latency=latency, error_rate=error_rate, quota_limit=ledger.daily_quota,
+                                  client_index=0 if clients else None)
+            fakes = {youtube.http.client_index: youtube}
+            fakes.update({client: youtube.add_client(client) for client in range(1, clients)})
+            api_clients = dict(fakes)
+            if http:
+                for client, fake in fakes.items():
+                    SERVERS.append(FakeYouTubeServer(fake))
+                    api_clients[client] = SERVERS[-1].client()
+            cache = MatchCache("history/match_cache.json")
+            results = {"initial": run_sync(sp, api_clients, fakes, cache, trace_memory, clients > 0)}
+            sp.replace_tracks(CHANGED_FRACTION)
+            results["incremental"] = run_sync(sp, api_clients, fakes, cache, trace_memory, clients > 0)
+            sp.relink_tracks(CHANGED_FRACTION)
+            results["relinked"] = run_sync(sp, api_clients, fakes, cache, trace_memory, clients > 0)
+            return results
+        finally:
+            for server in SERVERS:
+                server.close()
+            SERVERS.clear()
+            ledger.save()
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per fake request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests failing with 503")
+    parser.add_argument("--memory", action="store_true",
+                        help="report peak memory (tracemalloc slows every run down)")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="requests per second allowed by the rate limiter (default: unlimited)")
+    parser.add_argument("--clients", type=int, default=0, help="fan the searches out over this many clients")
+    parser.add_argument("--daily-quota", type=int, default=None,
+                        help="quota units per client per day (default: unlimited)")
+    parser.add_argument("--http", action="store_true",
+                        help="serve the fake YouTube API on localhost and use real googleapiclient clients")
+    args = parser.parse_args()
+
+    api.rate_limiter = api.TokenBucket(args.rate or 1e9)
+    ledger.daily_quota = args.daily_quota or 10 ** 12
+    for size in args.sizes:
+        for scenario, result in bench(size, args.latency, args.error_rate, args.memory, args.clients,
+                                      args.http).items():
+            print(json.dumps(dict(size=size, scenario=scenario, **result)))
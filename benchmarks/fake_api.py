@@ -0,0 +1,253 @@
+"""
+Offline stand-ins for the YouTube Data API client returned by
+googleapiclient.discovery.build and for spotipy.Spotify, implementing only the
+calls this project makes. Requests can be delayed, made to fail, and are
+charged against the same quota costs as the real API.
+"""
+import hashlib
+import itertools
+import json
+import random
+import threading
+import time
+from collections import Counter
+
+import googleapiclient.errors
+import httplib2
+
+from spotify2youtube.api import NOT_IDEMPOTENT
+from spotify2youtube.quota import QUOTA_COSTS
+
+SEARCH_RESULTS = 5
+
+
+def _http_error(status, reason, message):
+    content = json.dumps({"error": {"code": status, "message": message,
+                                    "errors": [{"reason": reason, "message": message}]}}).encode()
+    return googleapiclient.errors.HttpError(httplib2.Response({"status": status}), content, uri="fake://youtube")
+
+
+class FakeHttp:
+    """ Stands in for the authorized http object; carries the client index like the real one."""
+
+    def __init__(self, client_index=None):
+        self.client_index = client_index
+
+
+class FakeRequest:
+    def __init__(self, api, method_id, handler, kwargs):
+        self.api = api
+        self.methodId = method_id
+        self.http = api.http
+        self.headers = {}
+        self._handler = handler
+        self._kwargs = kwargs
+
+    def execute(self, http=None, num_retries=0):
+        return self.api.call(self.methodId, self._handler, self._kwargs, self.headers)
+
+
+class FakeResource:
+    def __init__(self, api, name, handlers):
+        self._api = api
+        self._name = name
+        self._handlers = handlers
+
+    def __getattr__(self, method):
+        handler = self._handlers[method]
+        method_id = f"youtube.{self._name}.{method}"
+        return lambda **kwargs: FakeRequest(self._api, method_id, handler, kwargs)
+
+
+class FakeYouTube:
+    """
+    In-memory YouTube Data API.
+    :param latency: seconds every request takes
+    :param error_rate: probability of a request failing with a retryable 503,
+        inserts and updates never fail as they are not retried
+    :param quota_limit: units after which every request fails with quotaExceeded
+    List responses carry an etag and honour If-None-Match with a 304.
+    """
+
+    def __init__(self, latency=0.0, error_rate=0.0, quota_limit=None, seed=0, client_index=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.quota_limit = quota_limit
+        self.http = FakeHttp(client_index)
+        self.requests = Counter()
+        self.units = Counter()
+        self.first_call = {}        # op -> time.perf_counter() of its first request
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._playlists = {}        # playlist id -> {"title", "items": [playlist item]}
+
+    def add_client(self, client_index):
+        """ Another client (Cloud project) of the same account: same playlists, its own quota and counters."""
+        client = FakeYouTube(self.latency, self.error_rate, self.quota_limit, seed=client_index,
+                             client_index=client_index)
+        client._lock = self._lock
+        client._ids = self._ids
+        client._playlists = self._playlists
+        return client
+
+    # googleapiclient.discovery.Resource interface
+
+    def search(self):
+        return FakeResource(self, "search", {"list": self._search_list})
+
+    def videos(self):
+        return FakeResource(self, "videos", {"list": self._videos_list})
+
+    def playlists(self):
+        return FakeResource(self, "playlists", {"list": self._playlists_list,
+                                                "insert": self._playlists_insert})
+
+    def playlistItems(self):
+        return FakeResource(self, "playlistItems", {"list": self._playlist_items_list,
+                                                    "insert": self._playlist_items_insert,
+                                                    "delete": self._playlist_items_delete})
+
+    # accounting
+
+    @property
+    def total_units(self):
+        return sum(self.units.values())
+
+    def call(self, method_id, handler, kwargs, headers=None):
+        op = method_id.split(".", 1)[1]
+        with self._lock:
+            self.requests[op] += 1
+            self.first_call.setdefault(op, time.perf_counter())
+            self.units[op] += QUOTA_COSTS.get(op, 1)
+            over_quota = self.quota_limit is not None and self.total_units > self.quota_limit
+            fail = not op.endswith(NOT_IDEMPOTENT) and self._random.random() < self.error_rate
+        if self.latency:
+            time.sleep(self.latency)
+        if over_quota:
+            raise _http_error(403, "quotaExceeded", "The request cannot be completed because you have "
+                                                    "exceeded your quota. (quotaExceeded)")
+        if fail:
+            raise _http_error(503, "backendError", "Backend Error")
+        with self._lock:
+            response = handler(**kwargs)
+        if isinstance(response, dict):
+            response["etag"] = hashlib.sha1(json.dumps(response, sort_keys=True).encode()).hexdigest()
+            if headers and headers.get("If-None-Match") == response["etag"]:
+                raise _http_error(304, "notModified", "Not Modified")
+        return response
+
+    # endpoints
+
+    def _new_id(self, prefix):
+        return f"{prefix}{next(self._ids):08d}"
+
+    def _search_list(self, q, maxResults=5, **kwargs):
+        digest = hashlib.sha1(q.encode("utf-8")).hexdigest()[:9]
+        artist = q.split(" - ")[0]
+        channels = [f"{artist} - Topic", f"{artist}VEVO", "Fake Lyrics", "Fake Channel", "Fake Channel"]
+        return {"items": [{"id": {"kind": "youtube#video", "videoId": f"{digest}{i:02d}"},
+                           "snippet": {"title": f"{q} ({i})", "channelTitle": channels[i]}}
+                          for i in range(min(maxResults, SEARCH_RESULTS))]}
+
+    def _videos_list(self, id, **kwargs):
+        items = []
+        for video_id in id.split(","):
+            digest = int(hashlib.sha1(video_id.encode()).hexdigest()[:8], 16)
+            items.append({"id": video_id, "statistics": {"viewCount": str(digest >> 8)},
+                          "contentDetails": {"duration": f"PT3M{digest % 60}S"}})
+        return {"items": items}
+
+    def _playlists_list(self, mine=True, maxResults=5, pageToken="", **kwargs):
+        items = [{"id": playlist_id, "etag": f'{playlist_id}-{len(playlist["items"])}',
+                  "snippet": {"title": playlist["title"], "channelTitle": "fake_user"},
+                  "contentDetails": {"itemCount": len(playlist["items"])}}
+                 for playlist_id, playlist in self._playlists.items()]
+        return self._page(items, maxResults, pageToken)
+
+    def _playlists_insert(self, body, **kwargs):
+        playlist_id = self._new_id("PL")
+        self._playlists[playlist_id] = {"title": body["snippet"]["title"], "items": []}
+        return {"id": playlist_id, "snippet": {"title": body["snippet"]["title"], "channelTitle": "fake_user"}}
+
+    def _playlist_items_list(self, playlistId, maxResults=5, pageToken="", **kwargs):
+        return self._page(self._playlists[playlistId]["items"], maxResults, pageToken)
+
+    def _playlist_items_insert(self, body, **kwargs):
+        snippet = body["snippet"]
+        video_id = snippet["resourceId"]["videoId"]
+        item = {"id": self._new_id("PLI"),
+                "snippet": {"title": f"Video {video_id}", "playlistId": snippet["playlistId"],
+                            "resourceId": {"kind": "youtube#video", "videoId": video_id}},
+                "contentDetails": {"videoId": video_id}}
+        items = self._playlists[snippet["playlistId"]]["items"]
+        items.insert(snippet.get("position", len(items)), item)
+        return item
+
+    def _playlist_items_delete(self, id, **kwargs):
+        for playlist in self._playlists.values():
+            for i, item in enumerate(playlist["items"]):
+                if item["id"] == id:
+                    del playlist["items"][i]
+                    return ""
+        raise _http_error(404, "playlistItemNotFound", "Playlist item not found.")
+
+    @staticmethod
+    def _page(items, max_results, page_token):
+        start = int(page_token or 0)
+        response = {"items": items[start:start + max_results],
+                    "pageInfo": {"totalResults": len(items), "resultsPerPage": max_results}}
+        if start + max_results < len(items):
+            response["nextPageToken"] = str(start + max_results)
+        return response
+
+
+class FakeSpotify:
+    """ In-memory spotipy.Spotify serving one playlist of generated tracks."""
+
+    def __init__(self, num_tracks, latency=0.0, name="Benchmark", owner="bench_user"):
+        self.latency = latency
+        self.name = name
+        self.owner = owner
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._next_track = 0
+        self.tracks = [self._new_track() for i in range(num_tracks)]
+
+    def _new_track(self):
+        i = self._next_track
+        self._next_track += 1
+        return {"added_at": "2020-04-24T13:19:31Z",
+                "track": {"uri": f"spotify:track:{i:022d}", "name": f"Track {i}",
+                          "artists": [{"name": f"Artist {i % 997}"}], "duration_ms": 180000 + i % 60000,
+                          "external_ids": {"isrc": f"USFAK{i:07d}"}}}
+
+    def relink_tracks(self, fraction):
+        """ Give the oldest fraction of the playlist new URIs, as Spotify does when it relinks a track."""
+        for playlist_track in self.tracks[:int(len(self.tracks) * fraction)]:
+            playlist_track["track"] = dict(playlist_track["track"], uri=playlist_track["track"]["uri"] + "r")
+
+    def replace_tracks(self, fraction):
+        """ Swap the oldest fraction of the playlist for new tracks."""
+        count = int(len(self.tracks) * fraction)
+        self.tracks = self.tracks[count:] + [self._new_track() for i in range(count)]
+
+    def _call(self):
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    @property
+    def snapshot_id(self):
+        return hashlib.sha1(",".join(t["track"]["uri"] for t in self.tracks).encode()).hexdigest()
+
+    def playlist(self, playlist_id, fields=None, **kwargs):
+        self._call()
+        return {"name": self.name, "owner": {"display_name": self.owner}, "snapshot_id": self.snapshot_id}
+
+    def playlist_items(self, playlist_id, fields=None, limit=100, offset=0, **kwargs):
+        self._call()
+        items = self.tracks[offset:offset + limit]
+        return {"items": items, "total": len(self.tracks),
+                "next": "more" if offset + limit < len(self.tracks) else None}
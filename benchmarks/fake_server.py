@@ -0,0 +1,125 @@
+"""
+A FakeYouTube from fake_api.py served as the YouTube Data API REST endpoints
+on localhost. Clients built with FakeYouTubeServer.client are real
+googleapiclient clients on the pooled transport, so a benchmark through the
+server also measures request building, keep-alive connections and the
+classification of HTTP error responses. Spotify stays in-process.
+"""
+import json
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import googleapiclient.discovery
+import googleapiclient.errors
+from googleapiclient.discovery_cache import get_static_doc
+
+from spotify2youtube import transport
+
+# (HTTP method, resource) -> method of the resource
+ROUTES = {
+    ("GET", "search"): "list",
+    ("GET", "videos"): "list",
+    ("GET", "playlists"): "list",
+    ("POST", "playlists"): "insert",
+    ("GET", "playlistItems"): "list",
+    ("POST", "playlistItems"): "insert",
+    ("DELETE", "playlistItems"): "delete",
+}
+INT_PARAMETERS = ("maxResults",)
+BOOL_PARAMETERS = ("mine",)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive
+    # send each response in one segment, not headers and body apart into a delayed ACK
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._serve("GET")
+
+    def do_POST(self):
+        self._serve("POST")
+
+    def do_DELETE(self):
+        self._serve("DELETE")
+
+    def _serve(self, method):
+        url = urllib.parse.urlsplit(self.path)
+        resource = url.path.rstrip("/").rsplit("/", 1)[-1]
+        kwargs = {name: values[-1] for name, values in urllib.parse.parse_qs(url.query).items()}
+        for name in INT_PARAMETERS:
+            if name in kwargs:
+                kwargs[name] = int(kwargs[name])
+        for name in BOOL_PARAMETERS:
+            if name in kwargs:
+                kwargs[name] = kwargs[name] == "true"
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            kwargs["body"] = json.loads(self.rfile.read(length))
+
+        youtube = self.server.youtube
+        if (method, resource) not in ROUTES:
+            self._reply(404, json.dumps({"error": {"code": 404, "message": "Not Found"}}).encode())
+            return
+        method_name = ROUTES[method, resource]
+        handler = getattr(youtube, resource)()._handlers[method_name]
+        try:
+            response = youtube.call(f"youtube.{resource}.{method_name}", handler, kwargs, self.headers)
+        except googleapiclient.errors.HttpError as e:
+            self._reply(e.resp.status, b"" if e.resp.status == 304 else e.content)
+            return
+        if response == "":
+            self._reply(204, b"")
+        else:
+            self._reply(200, json.dumps(response).encode())
+
+    def _reply(self, status, content):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class FakeYouTubeServer:
+    """ Serves youtube (a FakeYouTube) on a free localhost port until close()."""
+
+    def __init__(self, youtube):
+        self.youtube = youtube
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.youtube = youtube
+        self._server.connections = 0
+        self._server.lock = threading.Lock()
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_port}/"
+
+    @property
+    def connections(self):
+        """ TCP connections accepted so far; stays low while keep-alive reuses them."""
+        return self._server.connections
+
+    def client(self):
+        """ googleapiclient YouTube client talking to this server, tagged with the fake's client index."""
+        http = transport.PooledHttp()
+        http.client_index = self.youtube.http.client_index
+        return googleapiclient.discovery.build_from_document(
+            get_static_doc("youtube", "v3"), http=http, client_options={"api_endpoint": self.url})
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
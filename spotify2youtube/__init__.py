@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+Spotify2Youtube
+
+- Usage
+    python -m spotify2youtube sync [--playlist URI] [--resume] [--reconcile] [--plan [FILE]] [--budget UNITS]
+                                   [--fan-out]
+    python -m spotify2youtube sync --config sync_config.json [--once]
+    python -m spotify2youtube dedupe PLAYLIST_ID [--dry-run]
+    python -m spotify2youtube cast [--ip IP] [--playlist-id PLAYLIST_ID] [--no-repeat] [--endless]
+    python -m spotify2youtube.history_store     (import every history/*.csv into history.db at once;
+                                                 sync imports a playlist's CSV on first use anyway)
+
+    After `pip install .` (`pip install .[cast]` for the cast command) the
+    subcommands are also available as `spotify2youtube sync ...`.
+
+- Obtain Youtube Data API Credentials
+    - Create new project at: https://console.developers.google.com/apis/dashboard
+    - Enable 'YouTube Data API v3'
+    - Create OAuth consent screen
+    - Create OAuth client ID
+    - Download JSON for the client ID
+    - Save JSON in client_serets/CLIENT_SECRET{number}
+    - Quota spent by each client is tracked in client_secrets/quota_ledger.json
+      and resets at midnight Pacific Time
+
+
+- Obtain Spotify API Credentials
+    - Create new project at: https://developer.spotify.com/dashboard/
+    - Add "http://localhost:8080" to "Redirect URIs"
+    - Save spotify_client_id and spotify_client_secret to client_secrets/spotify_secret.py
+
+- Directory structure
+    Spotify2Youtube/
+    ├── spotify2youtube/
+    ├── history/
+    │   ├──history.db
+    │   ├──spotify_username-spotify_playlist-youtube_username.csv (imported into history.db)
+    │   └──match_cache.json
+    └── client_secrets/
+        ├── CLIENT_SECRET0.json
+        ├── CLIENT_SECRET1.json
+        ├── token0.json (saved credentials, refreshed silently)
+        ├── youtube_v3_discovery.json
+        ├── quota_ledger.json
+        └── spotify_secret.py
+"""
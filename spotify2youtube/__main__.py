@@ -0,0 +1,69 @@
+"""
+Single entry point: python -m spotify2youtube {sync,dedupe,cast}.
+Subcommand modules are only imported once the subcommand is known, so each one
+only pays for the libraries it uses (spotipy for sync, pychromecast for cast).
+"""
+import argparse
+import importlib
+import sys
+
+
+def sync(args):
+    if args.config:
+        importlib.import_module(".batch", __package__).run(args)
+    else:
+        importlib.import_module(".sync", __package__).run(args)
+
+
+def dedupe(args):
+    importlib.import_module(".dedupe", __package__).run(args)
+
+
+def cast(args):
+    importlib.import_module(".cast", __package__).run(args)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="spotify2youtube", description="Spotify to YouTube playlist tools.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    sync_parser = subparsers.add_parser("sync", help="sync a Spotify playlist to YouTube")
+    sync_parser.add_argument("--playlist", help="Spotify playlist URI (default: SPOTIFY_PLAYLIST_URL)")
+    sync_parser.add_argument("--resume", action="store_true", help="finish a sync that was interrupted")
+    sync_parser.add_argument("--reconcile", action="store_true",
+                             help="repair the history against the live YouTube playlist before syncing")
+    sync_parser.add_argument("--plan", nargs="?", const="-", metavar="FILE",
+                             help="only plan the sync and write the plan as JSON to FILE "
+                                  "(default: stdout, with the status lines on stderr)")
+    sync_parser.add_argument("--budget", type=int, metavar="UNITS",
+                             help="quota units the sync may spend, newest Spotify tracks first")
+    sync_parser.add_argument("--fan-out", action="store_true",
+                             help="search with every client's quota at once, insert with the first client")
+    sync_parser.add_argument("--config", help="sync every playlist pair in this JSON config without prompting")
+    sync_parser.add_argument("--once", action="store_true", help="with --config: run a single cycle and exit")
+    sync_parser.set_defaults(func=sync)
+
+    dedupe_parser = subparsers.add_parser("dedupe", help="remove duplicate videos from a YouTube playlist")
+    dedupe_parser.add_argument("playlist_id", help="id of the YouTube playlist to clean up")
+    dedupe_parser.add_argument("--dry-run", action="store_true", help="only list the duplicates")
+    dedupe_parser.set_defaults(func=dedupe)
+
+    cast_parser = subparsers.add_parser("cast", help="shuffle a YouTube playlist onto a Chromecast")
+    cast_parser.add_argument("--ip", help="Chromecast address (default: CAST_IP)")
+    cast_parser.add_argument("--playlist-id", help="YouTube playlist id (default: PLAYLIST_ID)")
+    cast_parser.add_argument("--max-videos", type=int, help="videos to queue (default: MAX_NUM_OF_VIDEOS)")
+    cast_parser.add_argument("--no-repeat", action="store_true",
+                             help="skip videos cast before until the whole playlist was played")
+    cast_parser.add_argument("--endless", action="store_true",
+                             help="shuffle the whole playlist until stopped, topping up the queue as videos finish")
+    cast_parser.set_defaults(func=cast)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import metrics
+from . import transport
+from .quota import QUOTA_COSTS, QuotaExceeded, ledger, operation
+
+WORKERS = 8                 # concurrent requests in flight
+REQUESTS_PER_SECOND = 10    # sustained request rate across all workers
+NOT_IDEMPOTENT = (".insert", ".update")     # operations that must not be applied twice
+
+
+class TokenBucket:
+    """ Thread-safe token bucket: allows bursts of `capacity`, refilled at `rate` tokens/second."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+rate_limiter = TokenBucket(REQUESTS_PER_SECOND)
+
+
+def client_of(request):
+    """ Index of the CLIENT_SECRET the request's client was authenticated with."""
+    return getattr(getattr(request, "http", None), "client_index", None)
+
+
+def execute(request):
+    """
+    Execute a googleapiclient request through the rate limiter, retrying rate
+    limit and transient errors with the transport's backoff. Inserts and
+    updates are only retried when they were refused or never sent: after a
+    timeout or 5xx YouTube may have applied them already, so the error is
+    raised and journal.replay checks the live playlist instead. Every attempt
+    is charged to the client's quota ledger; a quota error raises
+    QuotaExceeded. Latency, cost and retries of the call are recorded in
+    metrics.
+    """
+    client = client_of(request)
+    op = operation(request)
+    idempotent = not op.endswith(NOT_IDEMPOTENT)
+    started = time.perf_counter()
+    units = 0
+    status = "ok"
+    attempt = 0
+    try:
+        for attempt in range(transport.MAX_RETRIES + 1):
+            rate_limiter.acquire()
+            if client is not None:
+                units += ledger.charge(client, op)
+            else:
+                units += QUOTA_COSTS.get(op, 1)
+            try:
+                return request.execute()
+            except Exception as e:
+                kind = transport.classify(e)
+                status = str(transport.status_of(e) or type(e).__name__)
+                if kind == transport.QUOTA:
+                    status = "quota"
+                    if client is not None:
+                        ledger.mark_exhausted(client)
+                    raise QuotaExceeded(client) from e
+                if not transport.should_retry(kind, attempt, idempotent=idempotent, error=e):
+                    raise
+                time.sleep(transport.backoff(attempt, e))
+                status = "ok"
+    except Exception as e:
+        if status == "ok":
+            status = type(e).__name__
+        raise
+    finally:
+        metrics.record_call(op, client, time.perf_counter() - started, units, attempt, status)
+
+
+def run_concurrently(func, items, workers=WORKERS):
+    """
+    Call func on every item with a pool of worker threads.
+    Results are yielded in the order of items, whatever order they finish in.
+    """
+    items = list(items)
+    if not items:
+        return
+    with ThreadPoolExecutor(max_workers=min(workers, len(items))) as executor:
+        yield from executor.map(func, items)
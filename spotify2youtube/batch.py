@@ -0,0 +1,125 @@
+"""
+Sync many Spotify playlists to YouTube from one unattended process:
+`spotify2youtube sync --config sync_config.json [--once]`.
+
+sync_config.json:
+    {
+        "interval": 3600,
+        "pairs": [
+            {"spotify": "spotify:playlist:37i9dQZEVXbMDoHDwVN2tF"},
+            {"spotify": "spotify:playlist:37i9dQZEVXbLRQDuF5jeBp", "youtube_title": "US Top 50",
+             "reconcile": true, "budget": 3000},
+            {"spotify": "spotify:playlist:37i9dQZF1DXcBWIGoYBM5M", "fan_out": true}
+        ]
+    }
+
+A pair's optional budget caps the quota units one cycle spends on it, newest
+tracks first. With fan_out the searches of a pair are spread over every client
+with quota left, for large first syncs. Spotify and every YouTube client are
+authenticated once and reused across pairs and cycles. All pairs share one
+match cache and the quota ledger, so a track that is on several playlists is
+only searched for once.
+"""
+import json
+import logging
+import time
+
+from . import history_store
+from . import metrics
+from .sync import get_playlist, iter_tracks, spotify_authentication, sync
+from .youtube_auth import youtube_authentication
+from .match_cache import MatchCache
+from .quota import QuotaExceeded, ledger
+
+DEFAULT_INTERVAL = 3600     # seconds between sync cycles
+
+
+class ClientPool:
+    """ Authenticated YouTube clients, created on first use and kept for the life of the process."""
+
+    def __init__(self):
+        self._clients = {}
+
+    def get(self):
+        """ :return: (client index, youtube) of the first client with quota left, or (None, None)"""
+        clients = ledger.available_clients()
+        if not clients:
+            return None, None
+        client = clients[0]
+        if client not in self._clients:
+            self._clients[client] = youtube_authentication(client)
+        return client, self._clients[client]
+
+    def all(self):
+        """ :return: client index -> youtube for every client with quota left"""
+        for client in ledger.available_clients():
+            if client not in self._clients:
+                self._clients[client] = youtube_authentication(client)
+        return {client: self._clients[client] for client in ledger.available_clients()}
+
+
+def sync_pair(sp, pool, conn, cache, pair):
+    """ :return: False when every client's quota is used up"""
+    playlist_uri = pair["spotify"]
+    # a Spotify playlist synced to several YouTube playlists has a snapshot per pair
+    snapshot_key = history_store.snapshot_key(playlist_uri, pair.get("youtube_title"))
+    spotify_playlist, spotify_username, snapshot_id = get_playlist(sp, playlist_uri)
+    if snapshot_id == history_store.get_snapshot(conn, snapshot_key):
+        print(f'"{spotify_playlist}" is unchanged since the last sync.')
+        return True
+
+    print(f'\nSyncing "{spotify_playlist}" by {spotify_username}')
+    print("==================================")
+    used_before = ledger.used_total()
+    while True:
+        client, youtube = pool.get()
+        if youtube is None:
+            print("No available client.")
+            return False
+        # the budget covers every client the pair rotates through
+        budget = pair.get("budget")
+        if budget is not None:
+            budget = max(0, budget - (ledger.used_total() - used_before))
+        try:
+            # unattended runs always finish an interrupted sync instead of stopping
+            in_sync = sync(youtube, iter_tracks(sp, playlist_uri), spotify_username, spotify_playlist, cache,
+                           resume=True, youtube_title=pair.get("youtube_title"),
+                           reconcile_playlist=pair.get("reconcile", False), budget=budget,
+                           search_clients=pool.all() if pair.get("fan_out") else None)
+            if in_sync:
+                history_store.save_snapshot(conn, snapshot_key, snapshot_id)
+            return True
+        except QuotaExceeded:
+            print(f"Quota for Client {client} is used up.")
+
+
+def run_cycle(sp, pool, conn, cache, pairs):
+    """ A pair that fails is logged and skipped until the next cycle, the other pairs still sync."""
+    for pair in pairs:
+        try:
+            if not sync_pair(sp, pool, conn, cache, pair):
+                break
+        except Exception:
+            logging.exception(f'Syncing {pair["spotify"]} failed.')
+    cache.save()
+    ledger.save()
+    metrics.write()
+
+
+def run(args):
+    with open(args.config, "r") as config_file:
+        config = json.load(config_file)
+    interval = config.get("interval", DEFAULT_INTERVAL)
+
+    logging.getLogger('googleapiclient.discovery_cache').setLevel(logging.ERROR)
+    logging.getLogger('googleapiclient.http').setLevel(logging.ERROR)
+    sp = spotify_authentication()
+    pool = ClientPool()
+    conn = history_store.connect()
+    cache = MatchCache()
+    while True:
+        started = time.monotonic()
+        run_cycle(sp, pool, conn, cache, config["pairs"])
+        if args.once:
+            break
+        time.sleep(max(0, interval - (time.monotonic() - started)))
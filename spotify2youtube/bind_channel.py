@@ -0,0 +1,35 @@
+"""
+Parsing of the lounge API's BrowserChannel bind responses, kept apart from
+youtube_controller so it can be used without pychromecast.
+"""
+import json
+
+
+class ChunkParser:
+    """
+    Incremental parser of the bind channel's response, a sequence of
+    "<length>\n<json array of length characters>" chunks. Text can be fed as
+    it arrives; complete chunks are parsed and appended to chunks. The server
+    counts lengths in JavaScript (UTF-16) units, in which an emoji is two.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self._buffer = ""
+
+    def feed(self, text):
+        self._buffer += text
+        while True:
+            self._buffer = self._buffer.lstrip()
+            newline = self._buffer.find("\n")
+            if newline == -1:
+                return
+            length = int(self._buffer[:newline])
+            start = newline + 1
+            # every character is at least one UTF-16 unit, so the chunk is within length characters
+            encoded = self._buffer[start:start + length].encode("utf-16-le")
+            if len(encoded) < 2 * length:
+                return
+            chunk = encoded[:2 * length].decode("utf-16-le")
+            self.chunks.append(json.loads(chunk))
+            self._buffer = self._buffer[start + len(chunk):]
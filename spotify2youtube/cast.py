@@ -0,0 +1,169 @@
+"""
+Shuffle a YouTube playlist onto a Chromecast: `spotify2youtube cast`.
+
+With --endless the playlist plays until stopped: only LOOKAHEAD videos are
+queued ahead of the current one and the queue is topped up as videos finish,
+drawing from a shuffled pool read from the local playlist mirror.
+"""
+import atexit
+import logging
+import random
+
+from . import history_store
+from . import metrics
+from . import play_history
+from . import playlist_mirror
+from .quota import QuotaExceeded, get_available_client
+from .youtube_auth import youtube_authentication
+
+CAST_IP = '192.168.1.194'
+PLAYLIST_ID = "PLV6jqh0YN16WilsuMThWe_Nw6evO6ArEP"
+MAX_NUM_OF_VIDEOS = 50
+LOOKAHEAD = 5       # videos kept queued ahead of the current one in endless mode
+MIRROR_MAX_AGE = 6 * 3600   # seconds the local copy of the playlist is used without asking YouTube
+
+def reservoir_sample(iterable, k):
+    """ k items picked uniformly at random from iterable in one pass, in random order."""
+    sample = []
+    for i, item in enumerate(iterable):
+        if i < k:
+            sample.append(item)
+        else:
+            j = random.randrange(i + 1)
+            if j < k:
+                sample[j] = item
+    random.shuffle(sample)
+    return sample
+
+def get_video_ids(youtube, conn, playlist_id=PLAYLIST_ID, max_videos=MAX_NUM_OF_VIDEOS, no_repeat=False):
+    """
+    Pick max_videos random videos of the playlist from its local mirror, which
+    is only refreshed (with etags) when older than MIRROR_MAX_AGE. With
+    no_repeat, videos cast before are skipped until every video was played.
+    """
+    if not playlist_mirror.is_fresh(conn, playlist_id, MIRROR_MAX_AGE):
+        playlist_mirror.refresh(conn, youtube, playlist_id)
+    played = play_history.played_ids(conn, playlist_id) if no_repeat else set()
+    def unplayed(skip):
+        return (item["videoId"] for item in playlist_mirror.iter_items(conn, playlist_id)
+                if item["videoId"] not in skip)
+    video_ids = reservoir_sample(unplayed(played), max_videos)
+    if no_repeat:
+        if len(video_ids) < max_videos and played:
+            # every video was played, start over with the rest of the sample
+            play_history.clear(conn, playlist_id)
+            video_ids += reservoir_sample(unplayed(set(video_ids)), max_videos - len(video_ids))
+        play_history.record(conn, playlist_id, video_ids)
+    return video_ids
+
+class VideoPool:
+    """
+    Shuffled video ids of a playlist, handed out without repeats. The ids come
+    from the playlist mirror: the cached copy at startup, then a refresh (one
+    304 per unchanged page) each time the pool runs dry and is reshuffled.
+    """
+
+    def __init__(self, conn, youtube, playlist_id):
+        self.conn = conn
+        self.youtube = youtube
+        self.playlist_id = playlist_id
+        self._ids = []
+        self._loaded = False
+
+    def _load(self):
+        items = playlist_mirror.cached_items(self.conn, self.playlist_id) if not self._loaded else []
+        if not items:
+            try:
+                items, changed = playlist_mirror.refresh(self.conn, self.youtube, self.playlist_id)
+            except QuotaExceeded:
+                # keep playing the last known copy of the playlist
+                print("Quota used up, reusing the cached playlist.")
+                items = playlist_mirror.cached_items(self.conn, self.playlist_id)
+        self._loaded = True
+        self._ids = [item["videoId"] for item in items]
+        random.shuffle(self._ids)
+
+    def take(self, count):
+        video_ids = []
+        while len(video_ids) < count:
+            if not self._ids:
+                self._load()
+                if not self._ids:
+                    break
+            video_ids.append(self._ids.pop())
+        return video_ids
+
+def connect_youtube(cast):
+    cast.wait()
+    print(cast.device)
+    print(cast.status)
+    print("====================================")
+
+    from .youtube_controller import YouTubeController
+    yt = YouTubeController()
+    cast.register_handler(yt)
+    yt.init_session()
+    return yt
+
+def start_queue(cast, yt, video_ids):
+    mc = cast.media_controller
+    if mc.status.player_is_playing or mc.status.player_is_paused:
+        yt.add_videos(video_ids)
+    else:
+        yt.play_videos(video_ids)
+    print(f"{len(video_ids)} songs added.")
+
+def setup_chromecast(cast, video_ids):
+    yt = connect_youtube(cast)
+    start_queue(cast, yt, video_ids)
+
+def endless_shuffle(cast, pool, lookahead=LOOKAHEAD):
+    """ Keep lookahead videos queued ahead of the current one until interrupted."""
+    from .status_listener import StatusMediaListener
+    yt = connect_youtube(cast)
+    mc = cast.media_controller
+    listener = StatusMediaListener(cast.name, cast, mc, yt, lookahead)
+    mc.register_status_listener(listener)
+
+    # the first video starts playing, the rest are queued ahead of it
+    video_ids = pool.take(lookahead + 1)
+    if not video_ids:
+        print("The playlist is empty.")
+        return
+    listener.queued(len(video_ids))
+    start_queue(cast, yt, video_ids)
+    while True:
+        listener.refill_needed.wait()
+        video_ids = pool.take(listener.missing())
+        if video_ids:
+            listener.queued(len(video_ids))
+            yt.add_videos(video_ids)
+
+def run(args):
+    import pychromecast
+    atexit.register(metrics.write)
+    available_client = get_available_client()
+    logging.getLogger('googleapiclient.discovery_cache').setLevel(logging.ERROR)
+    logging.getLogger('googleapiclient.http').setLevel(logging.ERROR)
+
+    # cast = find_chromecast()
+    cast = pychromecast.Chromecast(args.ip or CAST_IP)
+    playlist_id = args.playlist_id or PLAYLIST_ID
+    conn = history_store.connect()
+    playlist_mirror.init(conn)
+    play_history.init(conn)
+    if args.endless:
+        pool = VideoPool(conn, youtube_authentication(available_client), playlist_id)
+        endless_shuffle(cast, pool)
+        return
+    while True:
+        try:
+            youtube  = youtube_authentication(available_client)
+            video_ids = get_video_ids(youtube, conn, playlist_id, args.max_videos or MAX_NUM_OF_VIDEOS,
+                                      args.no_repeat)
+            break
+        except QuotaExceeded:
+            print("\n==================================\n")
+            print(f"Quota for Client {available_client} is used up.")
+            available_client = get_available_client()
+    setup_chromecast(cast, video_ids)
@@ -0,0 +1,86 @@
+"""
+Remove duplicate videos from a YouTube playlist: `spotify2youtube dedupe PLAYLIST_ID`.
+"""
+import atexit
+import logging
+from pprint import pprint
+
+from . import history_store
+from . import metrics
+from .api import run_concurrently
+from .match_cache import normalize
+from .playlist_items import list_playlist_items, remove_track
+from .quota import QuotaExceeded, get_available_client
+from .youtube_auth import youtube_authentication
+
+def find_duplicates(items, identities):
+    """
+    Items that repeat an earlier item of the playlist by videoId, or by the song
+    they were added for (same Spotify id, ISRC, or normalized artist and title).
+    Items without a history row are matched on the normalized title and channel
+    of their video instead, as different songs often share a title.
+    :param identities: playlistItemId -> (Spotify Id, ISRC, track key), see history_store.identities_by_item
+    """
+    seen = set()
+    duplicates = []
+    for item in items:
+        snippet = item["snippet"]
+        video_key = ("video", snippet["resourceId"]["videoId"])
+        title_key = ("title", normalize(snippet["title"]), snippet.get("videoOwnerChannelTitle"))
+        if item["id"] in identities:
+            keys = {video_key} | {(kind, value) for kind, value in zip(("spotify", "isrc", "track"),
+                                                                      identities[item["id"]]) if value is not None}
+        else:
+            keys = {video_key, title_key}
+        if keys & seen:
+            duplicates.append(item)
+        else:
+            seen |= keys | {title_key}
+    return duplicates
+
+def remove_tracks(youtube, to_del, conn):
+    """ Delete every item concurrently and remove them from the history in a single commit."""
+    deleted_ids = []
+    try:
+        deleted = run_concurrently(lambda item: remove_track(youtube, item["id"]), to_del)
+        for item, playlist_item_id in zip(to_del, deleted):
+            deleted_ids.append(playlist_item_id)
+            print(f"- {item['snippet']['title']}")
+    finally:
+        history_store.remove_items(conn, deleted_ids)
+
+def run(args):
+    atexit.register(metrics.write)
+
+    available_client = get_available_client()
+    logging.getLogger('googleapiclient.discovery_cache').setLevel(logging.ERROR)
+    logging.getLogger('googleapiclient.http').setLevel(logging.ERROR)
+    conn = history_store.connect()
+    history_store.import_all_csvs(conn)
+    while True:
+        try:
+            # Youtube login
+            youtube = youtube_authentication(available_client)
+
+            # find duplicates in the live playlist
+            items = list_playlist_items(youtube, args.playlist_id)
+            identities = history_store.identities_by_item(conn, (item["id"] for item in items))
+            to_del = find_duplicates(items, identities)
+            print(f"{len(to_del)} of {len(items)} videos are duplicates.")
+            pprint([item["snippet"]["title"] for item in to_del])
+            print("==================================\n")
+
+            # remove duplicates
+            if not args.dry_run:
+                remove_tracks(youtube, to_del, conn)
+            break
+
+        except QuotaExceeded:
+            print("\n==================================\n")
+            print(f"Quota for Client {available_client} is used up.")
+            available_client = get_available_client()
+
+        except Exception as e:
+            print(f'ERROR  :    {type(e).__name__}')
+            print(f'MESSAGE:    {e}')
+            break
@@ -0,0 +1,227 @@
+import csv
+import glob
+import os
+import sqlite3
+
+from .match_cache import track_key
+
+DB_FILE = "history/history.db"
+CSV_COLUMNS = ["Spotify Id", "Track", "Artist", "Added Date", "YT Title", "YT PlaylistItemId"]
+
+# rows are returned with the old CSV column names so callers can keep using row["YT Title"]
+SELECT_COLUMNS = ('spotify_id AS "Spotify Id", track AS "Track", artist AS "Artist", '
+                  'added_date AS "Added Date", yt_title AS "YT Title", '
+                  'yt_playlist_item_id AS "YT PlaylistItemId"')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    playlist TEXT NOT NULL,
+    spotify_id TEXT NOT NULL,
+    track TEXT,
+    artist TEXT,
+    added_date TEXT,
+    yt_title TEXT,
+    yt_playlist_item_id TEXT,
+    isrc TEXT,
+    duration_ms INTEGER,
+    track_key TEXT
+);
+CREATE TABLE IF NOT EXISTS imported_csv (
+    log_file TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS spotify_snapshot (
+    playlist_uri TEXT PRIMARY KEY,
+    snapshot_id TEXT NOT NULL
+);
+"""
+
+# created after the columns added since the first release were migrated
+INDEXES = """
+CREATE INDEX IF NOT EXISTS history_spotify_id ON history (playlist, spotify_id);
+CREATE INDEX IF NOT EXISTS history_playlist_item_id ON history (yt_playlist_item_id);
+CREATE INDEX IF NOT EXISTS history_isrc ON history (playlist, isrc);
+CREATE INDEX IF NOT EXISTS history_track_key ON history (playlist, track_key);
+CREATE INDEX IF NOT EXISTS history_added_date ON history (playlist, added_date);
+"""
+
+HISTORY_COLUMNS = ("playlist, spotify_id, track, artist, added_date, yt_title, yt_playlist_item_id, "
+                   "isrc, duration_ms, track_key")
+INSERT_HISTORY = f"INSERT INTO history ({HISTORY_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+
+
+def playlist_key(spotify_username, spotify_playlist, youtube_username):
+    """ Same name the CSV history files used, without directory and extension."""
+    return f"{spotify_username}-{spotify_playlist}-{youtube_username}"
+
+
+def connect(path=DB_FILE):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.create_function("canonical_key", 2, canonical_key, deterministic=True)
+    conn.executescript(SCHEMA)
+    add_missing_columns(conn, "history", {"isrc": "TEXT", "duration_ms": "INTEGER", "track_key": "TEXT"})
+    with conn:
+        conn.execute("UPDATE history SET track_key = canonical_key(artist, track) WHERE track_key IS NULL")
+    conn.executescript(INDEXES)
+    return conn
+
+
+def canonical_key(artist, track):
+    """ Normalized "artist - track", the identity of a song across Spotify relinks and re-releases."""
+    if artist is None or track is None:
+        return None
+    return track_key(artist, track)
+
+
+def add_missing_columns(conn, table, columns):
+    """ Add the columns ({name: type}) a table created by an older version lacks."""
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    with conn:
+        for name, column_type in columns.items():
+            if name not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}")
+
+
+def import_csv(conn, playlist, log_file):
+    """
+    One-shot import of a CSV history file into the store.
+    Files that were already imported are skipped.
+    """
+    if conn.execute("SELECT 1 FROM imported_csv WHERE log_file = ?", (log_file,)).fetchone():
+        return 0
+    if not os.path.exists(log_file):
+        return 0
+    with open(log_file, newline="", encoding="utf-8") as f:
+        rows = [[row.get(column) for column in CSV_COLUMNS] for row in csv.DictReader(f)]
+    with conn:
+        conn.executemany(INSERT_HISTORY, [[playlist] + row + [None, None, canonical_key(row[2], row[1])]
+                                          for row in rows])
+        conn.execute("INSERT INTO imported_csv VALUES (?)", (log_file,))
+    print(f"Imported {len(rows)} rows from {log_file}.")
+    return len(rows)
+
+
+def import_all_csvs(conn, directory="history"):
+    for log_file in sorted(glob.glob(os.path.join(directory, "*.csv"))):
+        playlist = os.path.splitext(os.path.basename(log_file))[0]
+        import_csv(conn, playlist, log_file)
+
+
+def start_diff(conn):
+    """ Forget the Spotify tracks seen by the previous diff on this connection."""
+    with conn:
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS current_tracks "
+                     "(spotify_id TEXT PRIMARY KEY, isrc TEXT, track_key TEXT)")
+        conn.execute("CREATE INDEX IF NOT EXISTS temp.current_tracks_isrc ON current_tracks (isrc)")
+        conn.execute("CREATE INDEX IF NOT EXISTS temp.current_tracks_key ON current_tracks (track_key)")
+        conn.execute("DELETE FROM current_tracks")
+
+
+# a history row h and a Spotify track c are the same song when any identity matches,
+# one NOT EXISTS per identity so that each of them is an index lookup
+IDENTITIES = ("spotify_id", "isrc", "track_key")
+
+
+def _not_same_song(source, condition="1"):
+    return " AND ".join(f"NOT EXISTS (SELECT 1 FROM {source} WHERE {condition} AND h.{column} = c.{column})"
+                        for column in IDENTITIES)
+
+
+def missing_ids(conn, playlist, tracks):
+    """
+    Record a batch of the current Spotify tracks as they stream in. Tracks are
+    matched on their canonical identity: Spotify id, ISRC, or normalized artist
+    and title, so a relinked or re-released song is not added again.
+    :param tracks: (spotify_id, isrc, artist, track) tuples
+    :return: set of Spotify ids of the songs seen for the first time since
+     start_diff that are missing from the history
+    """
+    first_seen = []
+    with conn:
+        for spotify_id, isrc, artist, track in tracks:
+            key = canonical_key(artist, track)
+            if conn.execute("SELECT 1 FROM current_tracks WHERE spotify_id = ? OR isrc = ? OR track_key = ?",
+                            (spotify_id, isrc, key)).fetchone():
+                continue
+            conn.execute("INSERT INTO current_tracks VALUES (?, ?, ?)", (spotify_id, isrc, key))
+            first_seen.append(spotify_id)
+        if not first_seen:
+            return set()
+        return {row[0] for row in conn.execute(
+            f"SELECT spotify_id FROM current_tracks c WHERE spotify_id IN ({','.join('?' * len(first_seen))}) "
+            f"AND {_not_same_song('history h', 'h.playlist = ?')}",
+            first_seen + [playlist] * len(IDENTITIES))}
+
+
+def removed_rows(conn, playlist):
+    """ History rows whose song was not seen since start_diff, i.e. no longer on Spotify."""
+    return conn.execute(
+        f"SELECT {SELECT_COLUMNS} FROM history h WHERE playlist = ? "
+        f"AND {_not_same_song('current_tracks c')} ORDER BY rowid", (playlist,)).fetchall()
+
+
+def item_ids(conn, playlist):
+    return {row[0] for row in conn.execute(
+        "SELECT yt_playlist_item_id FROM history WHERE playlist = ?", (playlist,))}
+
+
+def identities_by_item(conn, playlist_item_ids):
+    """
+    YT PlaylistItemId -> (Spotify Id, ISRC, track key), looked up across the
+    history of every playlist.
+    """
+    playlist_item_ids = list(playlist_item_ids)
+    found = {}
+    for start in range(0, len(playlist_item_ids), 500):
+        chunk = playlist_item_ids[start:start + 500]
+        found.update((row[0], tuple(row[1:])) for row in conn.execute(
+            "SELECT yt_playlist_item_id, spotify_id, isrc, track_key FROM history WHERE yt_playlist_item_id IN "
+            f"({','.join('?' * len(chunk))})", chunk))
+    return found
+
+
+def count_added_since(conn, playlist, added_date):
+    """ Number of history rows of tracks added on Spotify at or after added_date."""
+    return conn.execute("SELECT COUNT(*) FROM history WHERE playlist = ? AND added_date >= ?",
+                        (playlist, added_date)).fetchone()[0]
+
+
+def add_rows(conn, playlist, rows):
+    """
+    Insert rows of [Spotify Id, Track, Artist, Added Date, YT Title, YT PlaylistItemId, ISRC, Duration]
+    in one transaction.
+    """
+    with conn:
+        conn.executemany(INSERT_HISTORY, [[playlist] + list(row) + [canonical_key(row[2], row[1])] for row in rows])
+
+
+def remove_items(conn, playlist_item_ids):
+    with conn:
+        conn.executemany("DELETE FROM history WHERE yt_playlist_item_id = ?",
+                         ((i,) for i in playlist_item_ids))
+
+
+def snapshot_key(playlist_uri, youtube_title=None):
+    """ Key of the snapshot of a Spotify playlist synced to the YouTube playlist titled youtube_title."""
+    return playlist_uri if youtube_title is None else f"{playlist_uri}|{youtube_title}"
+
+
+def get_snapshot(conn, playlist_uri):
+    """ snapshot_id of the Spotify playlist at the end of its last successful sync."""
+    row = conn.execute("SELECT snapshot_id FROM spotify_snapshot WHERE playlist_uri = ?", (playlist_uri,)).fetchone()
+    return row[0] if row else None
+
+
+def save_snapshot(conn, playlist_uri, snapshot_id):
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO spotify_snapshot VALUES (?, ?)", (playlist_uri, snapshot_id))
+
+
+if __name__ == "__main__":
+    # one-shot import of every history/*.csv into history/history.db
+    import_all_csvs(connect())
@@ -0,0 +1,140 @@
+"""
+Write-ahead journal of the operations a sync performs, kept in history.db next
+to the history table. Every insert/delete is recorded as "planned" before the
+request is sent and as "done" once YouTube answered, and every search result is
+recorded as soon as it is known. After a crash, replay() brings the history
+back in line with what actually happened so nothing is inserted twice and no
+search is paid for twice.
+"""
+import time
+
+from .history_store import HISTORY_COLUMNS, add_missing_columns
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS journal (
+    id INTEGER PRIMARY KEY,
+    playlist TEXT NOT NULL,
+    op TEXT NOT NULL,
+    status TEXT NOT NULL,
+    spotify_id TEXT,
+    track TEXT,
+    artist TEXT,
+    added_date TEXT,
+    video_id TEXT,
+    yt_title TEXT,
+    yt_playlist_item_id TEXT,
+    time REAL,
+    isrc TEXT,
+    duration_ms INTEGER
+);
+CREATE INDEX IF NOT EXISTS journal_playlist ON journal (playlist, op, status);
+"""
+
+PLANNED = "planned"
+DONE = "done"
+
+
+def init(conn):
+    conn.executescript(SCHEMA)
+    add_missing_columns(conn, "journal", {"isrc": "TEXT", "duration_ms": "INTEGER"})
+
+
+def is_empty(conn, playlist):
+    return conn.execute("SELECT 1 FROM journal WHERE playlist = ? LIMIT 1", (playlist,)).fetchone() is None
+
+
+def record_searches(conn, playlist, tracks, video_ids):
+    with conn:
+        conn.executemany(
+            "INSERT INTO journal (playlist, op, status, spotify_id, video_id, time) VALUES (?, 'search', ?, ?, ?, ?)",
+            [(playlist, DONE, track.spotify_id, video_id, time.time())
+             for track, video_id in zip(tracks, video_ids) if video_id is not None])
+
+
+def resolved_video_ids(conn, playlist):
+    """ Spotify Id -> videoId for every search already paid for by the interrupted run."""
+    return {row["spotify_id"]: row["video_id"] for row in conn.execute(
+        "SELECT spotify_id, video_id FROM journal WHERE playlist = ? AND op = 'search'", (playlist,))}
+
+
+def plan_insert(conn, playlist, track, video_id):
+    with conn:
+        cursor = conn.execute(
+            "INSERT INTO journal (playlist, op, status, spotify_id, track, artist, added_date, video_id, time, "
+            "isrc, duration_ms) VALUES (?, 'insert', ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (playlist, PLANNED, track.spotify_id, track.name, track.artist, track.added_date,
+             video_id, time.time(), track.isrc, track.duration_ms))
+    return cursor.lastrowid
+
+
+def cancel_insert(conn, playlist, entry_id, spotify_id):
+    """ Drop a planned insert YouTube refused, and the search result it came from."""
+    with conn:
+        conn.execute("DELETE FROM journal WHERE id = ?", (entry_id,))
+        conn.execute("DELETE FROM journal WHERE playlist = ? AND op = 'search' AND spotify_id = ?",
+                     (playlist, spotify_id))
+
+
+def plan_deletes(conn, playlist, rows):
+    with conn:
+        conn.executemany(
+            "INSERT INTO journal (playlist, op, status, spotify_id, yt_title, yt_playlist_item_id, time) "
+            "VALUES (?, 'delete', ?, ?, ?, ?, ?)",
+            [(playlist, PLANNED, row['Spotify Id'], row['YT Title'], row['YT PlaylistItemId'], time.time())
+             for row in rows])
+
+
+def complete_insert(conn, entry_id, yt_title, playlist_item_id):
+    with conn:
+        conn.execute("UPDATE journal SET status = ?, yt_title = ?, yt_playlist_item_id = ? WHERE id = ?",
+                     (DONE, yt_title, playlist_item_id, entry_id))
+
+
+def complete_delete(conn, playlist, playlist_item_id):
+    with conn:
+        conn.execute("UPDATE journal SET status = ? WHERE playlist = ? AND op = 'delete' AND yt_playlist_item_id = ?",
+                     (DONE, playlist, playlist_item_id))
+
+
+def clear(conn, playlist):
+    with conn:
+        conn.execute("DELETE FROM journal WHERE playlist = ?", (playlist,))
+
+
+def replay(conn, playlist, live_items=None):
+    """
+    Apply the outcome of an interrupted run to the history table.
+    - finished inserts missing from the history are added
+    - finished deletes still in the history are removed
+    - unfinished inserts are looked up in live_items ({videoId: (title, playlistItemId)}),
+      a callable only invoked when there are such inserts
+    Unfinished deletes are left alone: the next diff retries them.
+    :return: number of history rows repaired
+    """
+    repaired = 0
+    with conn:
+        unknown = conn.execute(
+            "SELECT id, video_id FROM journal WHERE playlist = ? AND op = 'insert' AND status = ?",
+            (playlist, PLANNED)).fetchall()
+        if unknown and live_items is not None:
+            recorded = {row[0] for row in conn.execute(
+                "SELECT yt_playlist_item_id FROM history WHERE playlist = ?", (playlist,))}
+            items = live_items()
+            for entry in unknown:
+                found = items.get(entry["video_id"])
+                if found and found[1] not in recorded:
+                    conn.execute("UPDATE journal SET status = ?, yt_title = ?, yt_playlist_item_id = ? WHERE id = ?",
+                                 (DONE, found[0], found[1], entry["id"]))
+                    recorded.add(found[1])
+
+        repaired += conn.execute(
+            f"INSERT INTO history ({HISTORY_COLUMNS}) SELECT playlist, spotify_id, track, artist, added_date, "
+            "yt_title, yt_playlist_item_id, isrc, duration_ms, canonical_key(artist, track) FROM journal j WHERE playlist = ? AND op = 'insert' AND status = ? AND NOT EXISTS "
+            "(SELECT 1 FROM history h WHERE h.yt_playlist_item_id = j.yt_playlist_item_id)",
+            (playlist, DONE)).rowcount
+        repaired += conn.execute(
+            "DELETE FROM history WHERE playlist = ? AND yt_playlist_item_id IN "
+            "(SELECT yt_playlist_item_id FROM journal WHERE playlist = ? AND op = 'delete' AND status = ?)",
+            (playlist, playlist, DONE)).rowcount
+        conn.execute("DELETE FROM journal WHERE playlist = ? AND op != 'search'", (playlist,))
+    return repaired
@@ -0,0 +1,97 @@
+import json
+import re
+import time
+
+from .metrics import write_atomic
+
+CACHE_FILE = "history/match_cache.json"
+CACHE_TTL = 30 * 86400      # seconds before a match is searched again
+CACHE_MAX_ENTRIES = 20000   # least recently used matches are evicted above this
+
+
+def normalize(text):
+    """
+    Normalize an artist/title string so that "Artist - Track (feat. X)" and
+    "artist - track" share a cache key.
+    """
+    text = text.casefold()
+    text = re.sub(r"[\(\[](feat|ft|with)\.? .*?[\)\]]", "", text)
+    text = re.sub(r"[^\w]+", " ", text)
+    return " ".join(text.split())
+
+
+def track_key(artist, track):
+    return f"{normalize(artist)} - {normalize(track)}"
+
+
+class MatchCache:
+    """ Persistent map of Spotify tracks to the YouTube videoId chosen for them."""
+
+    def __init__(self, path=CACHE_FILE, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._dirty = False
+        try:
+            with open(path, "r", encoding="utf-8") as cache_file:
+                self._entries = json.load(cache_file)
+        except (FileNotFoundError, ValueError):
+            self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _lookup(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if now - entry["time"] > self.ttl:
+            del self._entries[key]
+            self._dirty = True
+            return None
+        entry["used"] = now
+        self._dirty = True
+        return entry["video_id"]
+
+    def get(self, artist, track, spotify_id=None):
+        """
+        Return the cached videoId for a track, or None if it has to be searched.
+        The Spotify URI is checked first, then the normalized artist/title.
+        """
+        now = time.time()
+        video_id = None
+        if spotify_id:
+            video_id = self._lookup(spotify_id, now)
+        if video_id is None:
+            video_id = self._lookup(track_key(artist, track), now)
+        return video_id
+
+    def put(self, artist, track, video_id, spotify_id=None):
+        now = time.time()
+        entry = {"video_id": video_id, "time": now, "used": now}
+        self._entries[track_key(artist, track)] = entry
+        if spotify_id:
+            self._entries[spotify_id] = dict(entry)
+        self._dirty = True
+
+    def invalidate(self, artist, track, spotify_id=None):
+        """ Forget the match of a track, e.g. because its video was deleted or blocked."""
+        self._entries.pop(track_key(artist, track), None)
+        if spotify_id:
+            self._entries.pop(spotify_id, None)
+        self._dirty = True
+
+    def _evict(self):
+        now = time.time()
+        self._entries = {k: v for k, v in self._entries.items() if now - v["time"] <= self.ttl}
+        if len(self._entries) > self.max_entries:
+            by_use = sorted(self._entries.items(), key=lambda item: item[1]["used"], reverse=True)
+            self._entries = dict(by_use[:self.max_entries])
+
+    def save(self):
+        if not self._dirty:
+            return
+        self._evict()
+        write_atomic(self.path, json.dumps(self._entries))
+        self._dirty = False
@@ -0,0 +1,126 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+METRICS_JSON = "history/metrics.json"
+METRICS_PROM = "history/metrics.prom"
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+_lock = threading.Lock()
+_calls = defaultdict(lambda: {"count": 0, "errors": 0, "retries": 0, "quota_units": 0,
+                              "latency_sum": 0.0, "latency_max": 0.0,
+                              "latency_buckets": [0] * len(LATENCY_BUCKETS)})
+_stages = defaultdict(lambda: {"count": 0, "seconds": 0.0})
+_started = time.time()
+
+
+def record_call(endpoint, client, latency, quota_units, retries, status):
+    """ Record one api.execute call, including all of its retries."""
+    with _lock:
+        call = _calls[(endpoint, client, status)]
+        call["count"] += 1
+        call["retries"] += retries
+        call["quota_units"] += quota_units
+        call["latency_sum"] += latency
+        call["latency_max"] = max(call["latency_max"], latency)
+        if status != "ok":
+            call["errors"] += 1
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if latency <= bound:
+                call["latency_buckets"][i] += 1
+
+
+@contextmanager
+def stage(name):
+    """ Time a stage of the sync (spotify_fetch, index, diff, search, insert, delete)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        with _lock:
+            _stages[name]["count"] += 1
+            _stages[name]["seconds"] += elapsed
+
+
+def timed(name):
+    """ Decorator recording every call of the function as the stage `name`."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def snapshot():
+    with _lock:
+        return {
+            "started": _started,
+            "finished": time.time(),
+            "calls": [dict(endpoint=endpoint, client=client, status=status, **call)
+                      for (endpoint, client, status), call in _calls.items()],
+            "stages": {name: dict(values) for name, values in _stages.items()},
+        }
+
+
+def _labels(**labels):
+    return ",".join(f'{key}="{value}"' for key, value in labels.items())
+
+
+def prometheus(data):
+    lines = [
+        "# HELP spotify2youtube_api_calls_total YouTube API calls by endpoint, client and status.",
+        "# TYPE spotify2youtube_api_calls_total counter",
+    ]
+    for call in data["calls"]:
+        labels = _labels(endpoint=call["endpoint"], client=call["client"], status=call["status"])
+        lines.append(f"spotify2youtube_api_calls_total{{{labels}}} {call['count']}")
+    lines += ["# HELP spotify2youtube_api_retries_total Retried attempts of YouTube API calls.",
+              "# TYPE spotify2youtube_api_retries_total counter"]
+    for call in data["calls"]:
+        labels = _labels(endpoint=call["endpoint"], client=call["client"], status=call["status"])
+        lines.append(f"spotify2youtube_api_retries_total{{{labels}}} {call['retries']}")
+    lines += ["# HELP spotify2youtube_quota_units_total Quota units charged for YouTube API calls.",
+              "# TYPE spotify2youtube_quota_units_total counter"]
+    for call in data["calls"]:
+        labels = _labels(endpoint=call["endpoint"], client=call["client"], status=call["status"])
+        lines.append(f"spotify2youtube_quota_units_total{{{labels}}} {call['quota_units']}")
+    lines += ["# HELP spotify2youtube_api_latency_seconds Latency of YouTube API calls including retries.",
+              "# TYPE spotify2youtube_api_latency_seconds histogram"]
+    for call in data["calls"]:
+        labels = _labels(endpoint=call["endpoint"], client=call["client"], status=call["status"])
+        for bound, count in zip(LATENCY_BUCKETS, call["latency_buckets"]):
+            lines.append(f'spotify2youtube_api_latency_seconds_bucket{{{labels},le="{bound}"}} {count}')
+        lines.append(f'spotify2youtube_api_latency_seconds_bucket{{{labels},le="+Inf"}} {call["count"]}')
+        lines.append(f"spotify2youtube_api_latency_seconds_sum{{{labels}}} {call['latency_sum']}")
+        lines.append(f"spotify2youtube_api_latency_seconds_count{{{labels}}} {call['count']}")
+    lines += ["# HELP spotify2youtube_stage_seconds_total Time spent in each sync stage.",
+              "# TYPE spotify2youtube_stage_seconds_total counter"]
+    for name, values in data["stages"].items():
+        lines.append(f"spotify2youtube_stage_seconds_total{{{_labels(stage=name)}}} {values['seconds']}")
+    lines.append(f"spotify2youtube_last_run_timestamp_seconds {data['finished']}")
+    return "\n".join(lines) + "\n"
+
+
+def write_atomic(path, text):
+    """ Replace the file at path with text, so a crash never leaves it half written."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def write(json_path=METRICS_JSON, prom_path=METRICS_PROM):
+    """ Write the metrics collected so far as JSON and as a Prometheus textfile."""
+    data = snapshot()
+    write_atomic(json_path, json.dumps(data, indent=2))
+    write_atomic(prom_path, prometheus(data))
@@ -0,0 +1,111 @@
+"""
+Dry-run planning of a sync. The diff between the Spotify playlist and the
+history is turned into the explicit operations a sync would perform (tracks
+whose video is already known, searches, inserts and deletes) together with
+their quota cost and the clients whose quota would pay for it. A plan can be
+cut down to a budget, newest Spotify additions first.
+
+Inserts are always placed at an explicit position, so no playlistItems.update
+moves are ever planned.
+"""
+import json
+
+from .quota import QUOTA_COSTS, ledger
+
+INSERT_COST = QUOTA_COSTS["playlistItems.insert"]
+DELETE_COST = QUOTA_COSTS["playlistItems.delete"]
+SEARCH_COST = QUOTA_COSTS["search.list"]
+VIDEOS_COST = QUOTA_COSTS["videos.list"]
+CREATE_COST = QUOTA_COSTS["playlists.insert"]
+
+
+class Plan:
+    """
+    :param chunk_size: tracks resolved together; the candidates of all searches
+     of a chunk are looked up with one videos.list call
+    """
+
+    def __init__(self, playlist, playlist_id, chunk_size):
+        self.playlist = playlist
+        self.playlist_id = playlist_id      # None when the YouTube playlist would be created
+        self.chunk_size = chunk_size
+        self.adds = []          # (Track, videoId known without a search or None), newest first
+        self.deletes = []       # history rows no longer on Spotify
+        self.skipped_adds = 0
+        self.skipped_deletes = 0
+        self.planning_units = 0     # already spent on listing and mirroring playlists to make the plan
+
+    def sort(self):
+        """
+        Highest priority first: the tracks most recently added on Spotify, and
+        of tracks added at the same time the one further down the playlist.
+        Inserted top-down, this is the order a sync without a plan produces by
+        inserting every track at the top in playlist order.
+        """
+        self.adds.reverse()
+        self.adds.sort(key=lambda add: add[0].added_date or "", reverse=True)
+
+    def cost(self):
+        """ Quota units per operation, assuming every search finds a video to insert."""
+        searches = sum(video_id is None for track, video_id in self.adds)
+        videos_calls = sum(any(video_id is None for track, video_id in self.adds[start:start + self.chunk_size])
+                           for start in range(0, len(self.adds), self.chunk_size))
+        units = {
+            "planning": self.planning_units,
+            "playlists.insert": CREATE_COST if self.playlist_id is None else 0,
+            "search.list": searches * SEARCH_COST,
+            "videos.list": videos_calls * VIDEOS_COST,
+            "playlistItems.insert": len(self.adds) * INSERT_COST,
+            "playlistItems.delete": len(self.deletes) * DELETE_COST,
+        }
+        units["total"] = sum(units.values())
+        return units
+
+    def within_budget(self, budget):
+        """ Drop the lowest priority operations that would take the plan over budget units."""
+        spent = self.planning_units + (CREATE_COST if self.playlist_id is None else 0)
+        chunks_with_search = set()
+        kept = []
+        for track, video_id in self.adds:
+            cost = INSERT_COST
+            if video_id is None:
+                cost += SEARCH_COST
+                chunk = len(kept) // self.chunk_size
+                if chunk not in chunks_with_search:
+                    cost += VIDEOS_COST
+            if spent + cost > budget:
+                break
+            if video_id is None:
+                chunks_with_search.add(len(kept) // self.chunk_size)
+            kept.append((track, video_id))
+            spent += cost
+        deletes = self.deletes[:max(0, budget - spent) // DELETE_COST]
+        self.skipped_adds += len(self.adds) - len(kept)
+        self.skipped_deletes += len(self.deletes) - len(deletes)
+        self.adds = kept
+        self.deletes = deletes
+
+    def to_json(self):
+        cost = self.cost()
+        clients, uncovered = ledger.cover(cost["total"] - cost["planning"])
+        return json.dumps({
+            "playlist": self.playlist,
+            "playlist_id": self.playlist_id,
+            "operations": {
+                "create_playlist": int(self.playlist_id is None),
+                "known_videos": sum(video_id is not None for track, video_id in self.adds),
+                "searches": sum(video_id is None for track, video_id in self.adds),
+                "inserts": len(self.adds),
+                "deletes": len(self.deletes),
+                "moves": 0,
+            },
+            "skipped": {"inserts": self.skipped_adds, "deletes": self.skipped_deletes},
+            "quota": cost,
+            "clients": [{"client": client, "units": units} for client, units in clients],
+            "uncovered_units": uncovered,
+            "inserts": [{"spotify_id": track.spotify_id, "artist": track.artist, "track": track.name,
+                         "added_date": track.added_date, "video_id": video_id}
+                        for track, video_id in self.adds],
+            "deletes": [{"spotify_id": row["Spotify Id"], "yt_title": row["YT Title"],
+                         "yt_playlist_item_id": row["YT PlaylistItemId"]} for row in self.deletes],
+        }, indent=2)
@@ -0,0 +1,33 @@
+"""
+Videos already cast from each playlist, kept in history.db so shuffles can
+avoid repeating a video until the whole playlist was played.
+"""
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS played (
+    playlist_id TEXT NOT NULL,
+    video_id TEXT NOT NULL,
+    time REAL,
+    PRIMARY KEY (playlist_id, video_id)
+);
+"""
+
+
+def init(conn):
+    conn.executescript(SCHEMA)
+
+
+def played_ids(conn, playlist_id):
+    return {row[0] for row in conn.execute("SELECT video_id FROM played WHERE playlist_id = ?", (playlist_id,))}
+
+
+def record(conn, playlist_id, video_ids):
+    with conn:
+        conn.executemany("INSERT OR REPLACE INTO played VALUES (?, ?, ?)",
+                         [(playlist_id, video_id, time.time()) for video_id in video_ids])
+
+
+def clear(conn, playlist_id):
+    with conn:
+        conn.execute("DELETE FROM played WHERE playlist_id = ?", (playlist_id,))
@@ -0,0 +1,112 @@
+"""
+Index of the videos already on the user's YouTube playlists, so a track that
+one of our channels already holds is reused instead of searched for (100
+quota units). Built from the playlist mirrors in history.db: a playlist is
+only re-mirrored when its etag or item count changed since the last build.
+Videos an insert found deleted or blocked are left out of every later index.
+"""
+import time
+
+from .api import execute
+from .match_cache import normalize, track_key
+from . import playlist_mirror
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS indexed_playlist (
+    playlist_id TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS unavailable_video (
+    video_id TEXT PRIMARY KEY,
+    time REAL
+);
+"""
+
+
+def init(conn):
+    conn.executescript(SCHEMA)
+    playlist_mirror.init(conn)
+
+
+def list_playlists(youtube):
+    """ Every playlist of the authenticated channel, 50 (1 quota unit) per call."""
+    playlists = []
+    page_token = ""
+    while page_token is not None:
+        request = youtube.playlists().list(
+            part="snippet,contentDetails",
+            maxResults=50,
+            mine=True,
+            pageToken=page_token
+        )
+        response = execute(request)
+        playlists += response["items"]
+        page_token = response.get("nextPageToken")
+    return playlists
+
+
+def mark_unavailable(conn, video_id):
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO unavailable_video VALUES (?, ?)", (video_id, time.time()))
+
+
+def _fingerprint(playlist):
+    return f'{playlist.get("etag")}:{playlist.get("contentDetails", {}).get("itemCount")}'
+
+
+class PlaylistIndex:
+    """
+    Normalized "artist - track" -> videoId. Keys come from the history of
+    earlier syncs (exact Spotify artist/title) and from the video titles.
+    unavailable holds the videos YouTube refused to insert.
+    """
+
+    def __init__(self, unavailable=()):
+        self._by_track = {}
+        self._by_title = {}
+        self.unavailable = set(unavailable)
+
+    def __len__(self):
+        return len(self._by_track) + len(self._by_title)
+
+    def add_video(self, title, video_id):
+        self._by_title.setdefault(normalize(title), video_id)
+
+    def add_track(self, artist, track, video_id):
+        self._by_track.setdefault(track_key(artist, track), video_id)
+
+    def discard(self, video_id):
+        """ Drop every key that maps to video_id and never hand it out again."""
+        self.unavailable.add(video_id)
+        for keys in (self._by_track, self._by_title):
+            for key in [key for key, value in keys.items() if value == video_id]:
+                del keys[key]
+
+    def get(self, artist, track):
+        return self._by_track.get(track_key(artist, track)) or self._by_title.get(normalize(f"{artist} - {track}"))
+
+
+def build(conn, youtube, playlists):
+    """
+    :param playlists: the user's playlists, as returned by list_playlists
+    :return: PlaylistIndex over the items of every playlist
+    """
+    known = {row[0]: row[1] for row in conn.execute("SELECT playlist_id, fingerprint FROM indexed_playlist")}
+    index = PlaylistIndex(row[0] for row in conn.execute("SELECT video_id FROM unavailable_video"))
+    video_ids = {}      # playlistItemId -> videoId
+    for playlist in playlists:
+        fingerprint = _fingerprint(playlist)
+        if known.get(playlist["id"]) != fingerprint:
+            playlist_mirror.refresh(conn, youtube, playlist["id"])
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO indexed_playlist VALUES (?, ?)", (playlist["id"], fingerprint))
+        for item in playlist_mirror.iter_items(conn, playlist["id"]):
+            if item["videoId"] in index.unavailable:
+                continue
+            index.add_video(item["title"], item["videoId"])
+            video_ids[item["id"]] = item["videoId"]
+    for artist, track, playlist_item_id in conn.execute(
+            "SELECT artist, track, yt_playlist_item_id FROM history"):
+        if playlist_item_id in video_ids:
+            index.add_track(artist, track, video_ids[playlist_item_id])
+    return index
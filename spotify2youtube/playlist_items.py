@@ -0,0 +1,36 @@
+"""
+Requests on the items of a YouTube playlist, shared by sync and dedupe.
+"""
+import googleapiclient.errors
+
+from .api import execute
+
+
+def list_playlist_items(youtube, playlist_id):
+    """ Every item of the playlist in playlist order, 50 items (1 quota unit) per call."""
+    items = []
+    page_token = ""
+    while page_token is not None:
+        request = youtube.playlistItems().list(
+            part="snippet",
+            maxResults=50,
+            pageToken=page_token,
+            playlistId=playlist_id
+        )
+        response = execute(request)
+        items += response["items"]
+        page_token = response.get("nextPageToken")
+    return items
+
+
+def remove_track(youtube, playlist_item_id):
+    request = youtube.playlistItems().delete(
+        id = playlist_item_id
+    )
+    try:
+        execute(request)
+    except googleapiclient.errors.HttpError as e:
+        # already removed, e.g. by a run that was interrupted before updating the history
+        if e.resp.status != 404:
+            raise
+    return playlist_item_id
@@ -0,0 +1,109 @@
+"""
+Local copy of YouTube playlists, stored page by page in history.db together with
+each page's token and etag. refresh() re-requests every page with
+If-None-Match, so pages that did not change come back as an empty 304 and are
+served from the mirror.
+"""
+import json
+import time
+
+import googleapiclient.errors
+
+from .api import execute
+
+PAGE_SIZE = 50
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS mirror_page (
+    playlist_id TEXT NOT NULL,
+    page_index INTEGER NOT NULL,
+    page_token TEXT NOT NULL,
+    next_page_token TEXT,
+    etag TEXT,
+    items TEXT NOT NULL,
+    PRIMARY KEY (playlist_id, page_index)
+);
+CREATE TABLE IF NOT EXISTS mirror_refresh (
+    playlist_id TEXT PRIMARY KEY,
+    refreshed REAL NOT NULL
+);
+"""
+
+
+def init(conn):
+    conn.executescript(SCHEMA)
+
+
+def _compact(item):
+    return {"id": item["id"], "videoId": item["snippet"]["resourceId"]["videoId"],
+            "title": item["snippet"]["title"]}
+
+
+def _fetch_page(youtube, playlist_id, page_token, etag):
+    """ :return: the response, or None when the page still matches etag"""
+    request = youtube.playlistItems().list(
+        part="snippet",
+        maxResults=PAGE_SIZE,
+        pageToken=page_token,
+        playlistId=playlist_id
+    )
+    if etag:
+        request.headers["If-None-Match"] = etag
+    try:
+        return execute(request)
+    except googleapiclient.errors.HttpError as e:
+        if e.resp.status == 304:
+            return None
+        raise
+
+
+def refresh(conn, youtube, playlist_id):
+    """
+    Bring the mirror of the playlist up to date.
+    :return: items in playlist order as {"id", "videoId", "title"}, number of pages that changed
+    """
+    cached = {row["page_index"]: row for row in conn.execute(
+        "SELECT * FROM mirror_page WHERE playlist_id = ?", (playlist_id,))}
+    items = []
+    changed = 0
+    page_index = 0
+    page_token = ""
+    with conn:
+        while page_token is not None:
+            page = cached.get(page_index)
+            etag = page["etag"] if page is not None and page["page_token"] == page_token else None
+            response = _fetch_page(youtube, playlist_id, page_token, etag)
+            if response is None:
+                page_items = json.loads(page["items"])
+                next_page_token = page["next_page_token"]
+            else:
+                changed += 1
+                page_items = [_compact(item) for item in response["items"]]
+                next_page_token = response.get("nextPageToken")
+                conn.execute("INSERT OR REPLACE INTO mirror_page VALUES (?, ?, ?, ?, ?, ?)",
+                             (playlist_id, page_index, page_token, next_page_token, response.get("etag"),
+                              json.dumps(page_items)))
+            items += page_items
+            page_token = next_page_token
+            page_index += 1
+        conn.execute("DELETE FROM mirror_page WHERE playlist_id = ? AND page_index >= ?", (playlist_id, page_index))
+        conn.execute("INSERT OR REPLACE INTO mirror_refresh VALUES (?, ?)", (playlist_id, time.time()))
+    return items, changed
+
+
+def is_fresh(conn, playlist_id, max_age):
+    """ True when the mirror of the playlist was refreshed less than max_age seconds ago."""
+    row = conn.execute("SELECT refreshed FROM mirror_refresh WHERE playlist_id = ?", (playlist_id,)).fetchone()
+    return row is not None and time.time() - row[0] < max_age
+
+
+def iter_items(conn, playlist_id):
+    """ Yield the items of the playlist as of the last refresh, one page in memory at a time."""
+    cursor = conn.execute("SELECT items FROM mirror_page WHERE playlist_id = ? ORDER BY page_index", (playlist_id,))
+    for row in cursor:
+        yield from json.loads(row["items"])
+
+
+def cached_items(conn, playlist_id):
+    """ Items of the playlist as of the last refresh, without any API call."""
+    return list(iter_items(conn, playlist_id))
@@ -0,0 +1,159 @@
+import atexit
+import datetime
+import glob
+import json
+import re
+import threading
+from zoneinfo import ZoneInfo
+
+from .metrics import write_atomic
+
+LEDGER_FILE = "client_secrets/quota_ledger.json"
+CLIENT_SECRET_PATTERN = "client_secrets/CLIENT_SECRET*.json"
+DAILY_QUOTA = 10000     # units per client (Google Cloud project) per day
+SAVE_EVERY = 100        # units charged between ledger writes
+
+# https://developers.google.com/youtube/v3/determine_quota_cost
+QUOTA_COSTS = {
+    "search.list": 100,
+    "videos.list": 1,
+    "playlists.list": 1,
+    "playlists.insert": 50,
+    "playlists.update": 50,
+    "playlists.delete": 50,
+    "playlistItems.list": 1,
+    "playlistItems.insert": 50,
+    "playlistItems.update": 50,
+    "playlistItems.delete": 50,
+    "channels.list": 1,
+}
+
+
+class QuotaExceeded(Exception):
+    """ Raised when a client has used up its daily quota."""
+
+    def __init__(self, client):
+        super().__init__(f"Quota for Client {client} is used up.")
+        self.client = client
+
+
+def quota_day(now=None):
+    """ YouTube quotas reset at midnight Pacific Time."""
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    return now.astimezone(ZoneInfo("America/Los_Angeles")).date().isoformat()
+
+
+def operation(request):
+    """ "youtube.playlistItems.insert" -> "playlistItems.insert" """
+    method_id = getattr(request, "methodId", "") or ""
+    return method_id.split(".", 1)[-1]
+
+
+def configured_clients():
+    clients = []
+    for path in glob.glob(CLIENT_SECRET_PATTERN):
+        match = re.search(r"CLIENT_SECRET(\d+)\.json$", path)
+        if match:
+            clients.append(int(match.group(1)))
+    return sorted(clients)
+
+
+class QuotaLedger:
+    """
+    Units spent per operation type per client for the current Pacific-time day.
+    Stored as {client: {"day": "2020-04-24", "units": {"search.list": 300}, "exhausted": false}}.
+    """
+
+    def __init__(self, path=LEDGER_FILE, daily_quota=DAILY_QUOTA):
+        self.daily_quota = daily_quota
+        self._lock = threading.Lock()
+        self.load(path)
+
+    def load(self, path):
+        """ Switch to the ledger stored at path, dropping unsaved charges to the current one."""
+        with self._lock:
+            self.path = path
+            self._unsaved = 0
+            try:
+                with open(path, "r") as ledger_file:
+                    self._clients = json.load(ledger_file)
+            except (FileNotFoundError, ValueError):
+                self._clients = {}
+
+    def _entry(self, client):
+        today = quota_day()
+        entry = self._clients.get(str(client))
+        if entry is None or entry["day"] != today:
+            entry = {"day": today, "units": {}, "exhausted": False}
+            self._clients[str(client)] = entry
+        return entry
+
+    def charge(self, client, op):
+        cost = QUOTA_COSTS.get(op, 1)
+        with self._lock:
+            units = self._entry(client)["units"]
+            units[op] = units.get(op, 0) + cost
+            self._unsaved += cost
+            if self._unsaved >= SAVE_EVERY:
+                self._save()
+        return cost
+
+    def used(self, client):
+        with self._lock:
+            return sum(self._entry(client)["units"].values())
+
+    def used_total(self):
+        """ Units used today by all configured clients."""
+        return sum(self.used(client) for client in configured_clients())
+
+    def remaining(self, client):
+        with self._lock:
+            entry = self._entry(client)
+            if entry["exhausted"]:
+                return 0
+            return max(0, self.daily_quota - sum(entry["units"].values()))
+
+    def mark_exhausted(self, client):
+        with self._lock:
+            self._entry(client)["exhausted"] = True
+            self._save()
+
+    def available_clients(self, min_units=1):
+        return [client for client in configured_clients() if self.remaining(client) >= min_units]
+
+    def cover(self, units):
+        """
+        Clients whose remaining quota would pay for units, in the order they are used.
+        :return: [(client, units charged to it)], units no client can cover
+        """
+        clients = []
+        for client in self.available_clients():
+            if units <= 0:
+                break
+            charged = min(units, self.remaining(client))
+            clients.append((client, charged))
+            units -= charged
+        return clients, max(0, units)
+
+    def _save(self):
+        write_atomic(self.path, json.dumps(self._clients, indent=2))
+        self._unsaved = 0
+
+    def save(self):
+        with self._lock:
+            if self._unsaved:
+                self._save()
+
+
+ledger = QuotaLedger()
+atexit.register(ledger.save)
+
+
+def get_available_client():
+    clients = ledger.available_clients()
+    if not clients:
+        print("No available client.")
+        quit()
+    client = clients[0]
+    print(f"Client {client} is available ({ledger.remaining(client)} units left today).")
+    return client
@@ -0,0 +1,111 @@
+"""
+Ranking of the search candidates of a track. Every candidate is scored on how
+close its duration is to the Spotify track, how well its title matches the
+track and artist, whether it comes from an auto-generated "- Topic" channel
+(the plain audio track) and its views relative to the other candidates, so the
+audio upload wins over a music video with a long intro or a lyric video.
+Candidates of all tracks of a chunk are scored together as NumPy arrays.
+"""
+import re
+import time
+
+import numpy as np
+
+from .match_cache import normalize
+
+# weights of the signals, each of which is scaled to [0, 1]
+WEIGHT_DURATION = 3.0
+WEIGHT_TITLE = 2.0
+WEIGHT_ARTIST = 1.0
+WEIGHT_TOPIC = 1.5
+WEIGHT_VIEWS = 1.0
+DURATION_SCALE = 15.0   # seconds off the Spotify duration at which the duration signal drops to 1/e
+
+TOPIC_SUFFIX = " - Topic"
+ISO_DURATION = re.compile(r"P(?:(\d+)D)?T?(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS match_score (
+    spotify_id TEXT NOT NULL,
+    video_id TEXT NOT NULL,
+    score REAL,
+    chosen INTEGER,
+    time REAL
+);
+CREATE INDEX IF NOT EXISTS match_score_spotify_id ON match_score (spotify_id);
+"""
+
+
+def init(conn):
+    conn.executescript(SCHEMA)
+
+
+def parse_duration(duration):
+    """ Seconds of an ISO 8601 contentDetails.duration such as "PT3M25S"."""
+    match = ISO_DURATION.fullmatch(duration or "")
+    if not match:
+        return None
+    days, hours, minutes, seconds = (int(value or 0) for value in match.groups())
+    return ((days * 24 + hours) * 60 + minutes) * 60 + seconds
+
+
+def _similarity(a, b):
+    """ Share of the words of a that appear in b."""
+    words = set(normalize(a).split())
+    return len(words & set(normalize(b).split())) / len(words) if words else 0.0
+
+
+def rank(tracks, candidates, details):
+    """
+    :param tracks: Tracks that were searched for
+    :param candidates: list aligned with tracks of [(videoId, title, channelTitle)] search results
+    :param details: videoId -> (duration in seconds, view count) for the candidates that still exist
+    :return: list aligned with tracks of the best videoId (None when no candidate exists)
+     and [(spotify_id, videoId, score, chosen)] for every scored candidate
+    """
+    rows = [(i, video_id, title, channel) for i, results in enumerate(candidates)
+            for video_id, title, channel in results if video_id in details]
+    best = [None] * len(tracks)
+    if not rows:
+        return best, []
+
+    group = np.array([i for i, video_id, title, channel in rows])
+    duration = np.array([details[video_id][0] for i, video_id, title, channel in rows], dtype=float)
+    views = np.array([details[video_id][1] for i, video_id, title, channel in rows], dtype=float)
+    target = np.array([(tracks[i].duration_ms or 0) / 1000 for i, video_id, title, channel in rows])
+    title_match = np.array([_similarity(tracks[i].name, title) for i, video_id, title, channel in rows])
+    artist_match = np.array([_similarity(tracks[i].artist, f"{title} {channel}")
+                             for i, video_id, title, channel in rows])
+    topic = np.array([channel.endswith(TOPIC_SUFFIX) for i, video_id, title, channel in rows], dtype=float)
+
+    # without a Spotify duration the duration signal is left out
+    duration_match = np.where(target > 0, np.exp(-np.abs(duration - target) / DURATION_SCALE), 0.0)
+    log_views = np.log1p(views)
+    max_log_views = np.zeros(len(tracks))
+    np.maximum.at(max_log_views, group, log_views)
+    view_share = np.divide(log_views, max_log_views[group], out=np.zeros_like(log_views),
+                           where=max_log_views[group] > 0)
+
+    scores = (WEIGHT_DURATION * duration_match + WEIGHT_TITLE * title_match + WEIGHT_ARTIST * artist_match
+              + WEIGHT_TOPIC * topic + WEIGHT_VIEWS * view_share)
+
+    # highest score per track, the first candidate on ties
+    best_score = np.full(len(tracks), -np.inf)
+    np.maximum.at(best_score, group, scores)
+    chosen = np.zeros(len(rows), dtype=bool)
+    for row in np.flatnonzero(scores == best_score[group]):
+        if best[group[row]] is None:
+            best[group[row]] = rows[row][1]
+            chosen[row] = True
+
+    records = [(tracks[i].spotify_id, video_id, float(score), int(is_chosen))
+               for (i, video_id, title, channel), score, is_chosen in zip(rows, scores, chosen)]
+    return best, records
+
+
+def record(conn, records):
+    """ Keep the scores of every candidate, so bad matches can be traced back to their signals."""
+    now = time.time()
+    with conn:
+        conn.executemany("INSERT INTO match_score VALUES (?, ?, ?, ?, ?)",
+                         [record + (now,) for record in records])
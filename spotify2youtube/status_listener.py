@@ -0,0 +1,40 @@
+import threading
+
+
+class StatusMediaListener:
+    """
+    Media status listener of the endless shuffle. Every time a new video starts
+    it counts down the videos still queued ahead of it and sets refill_needed
+    once fewer than `lookahead` are left; the casting thread then tops the
+    queue up, so the status callback itself never waits on the network.
+    """
+
+    def __init__(self, name, cast, mc, yt, lookahead):
+        self.name = name
+        self.cast = cast
+        self.playing = mc.status.content_id
+        self.yt = yt
+        self.lookahead = lookahead
+        self.queued_ahead = 0
+        self.refill_needed = threading.Event()
+        self._lock = threading.Lock()
+
+    def new_media_status(self, status):
+        if status.content_id and status.content_id != self.playing:
+            print(status.title)
+            self.playing = status.content_id
+            with self._lock:
+                self.queued_ahead = max(0, self.queued_ahead - 1)
+                if self.queued_ahead < self.lookahead:
+                    self.refill_needed.set()
+
+    def queued(self, count):
+        """ Count videos added to the end of the queue."""
+        with self._lock:
+            self.queued_ahead += count
+
+    def missing(self):
+        """ :return: number of videos to add to get back to lookahead videos queued ahead"""
+        with self._lock:
+            self.refill_needed.clear()
+            return max(0, self.lookahead - self.queued_ahead)
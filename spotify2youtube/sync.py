@@ -0,0 +1,647 @@
+"""
+Sync a Spotify playlist to a YouTube playlist: `spotify2youtube sync`.
+"""
+import atexit
+import contextlib
+import importlib.util
+import itertools
+import logging
+import sys
+import threading
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import googleapiclient.errors
+
+from . import history_store
+from . import journal
+from . import metrics
+from . import playlist_index
+from . import planner
+from . import playlist_mirror
+from . import scoring
+from . import transport
+from .api import WORKERS, execute, run_concurrently
+from .match_cache import MatchCache
+from .playlist_items import list_playlist_items, remove_track
+from .quota import QuotaExceeded, get_available_client, ledger
+from .youtube_auth import youtube_authentication
+
+# spotify settings
+SPOTIFY_PLAYLIST_URL = "spotify:playlist:37i9dQZEVXbMDoHDwVN2tF"    # playlist to be converted
+SPOTIFY_PAGE_SIZE = 100     # max items per playlist_items call
+SPOTIFY_TRACK_FIELDS = "total,items(added_at,track(uri,name,duration_ms,external_ids(isrc),artists(name)))"
+SPOTIFY_SECRET_FILE = "client_secrets/spotify_secret.py"
+
+# youtube settings
+SEARCH_CHUNK_SIZE = 10      # tracks searched before their candidates are ranked together
+VIDEOS_PER_REQUEST = 50     # max ids per videos.list call
+UNAVAILABLE_VIDEO_REASONS = {"videoNotFound", "forbidden"}     # inserts refused for the video itself
+
+def load_spotify_secret(path=SPOTIFY_SECRET_FILE):
+    """
+    spotify_client_id and spotify_client_secret of the secret file in the working
+    directory, loaded by path as an installed console script has no cwd on sys.path.
+    """
+    spec = importlib.util.spec_from_file_location("spotify_secret", path)
+    secret = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(secret)
+    return secret.spotify_client_id, secret.spotify_client_secret
+
+def spotify_authentication():
+    import spotipy
+    spotify_client_id, spotify_client_secret = load_spotify_secret()
+    scope = 'user-library-read'
+
+    sp_oauth = spotipy.SpotifyOAuth(
+        client_id=spotify_client_id,
+        client_secret=spotify_client_secret,
+        redirect_uri='http://localhost:8080',
+        scope=scope,
+        show_dialog=False,
+        cache_path=".cache.json",
+        requests_session=transport.session()
+    )
+    token_info = sp_oauth.get_cached_token()
+    if not token_info:
+        code = sp_oauth.get_auth_response()
+        token = sp_oauth.get_access_token(code, as_dict=False)
+    else:
+        token = token_info["access_token"]
+
+    if token:
+        # the auth manager refreshes the cached token when it expires
+        return spotipy.Spotify(auth_manager=sp_oauth, requests_session=transport.session())
+    else:
+        print("Can't get token")
+
+class Track:
+    """ One entry of a Spotify playlist. __slots__ keeps Liked Songs-sized libraries small."""
+    __slots__ = ("spotify_id", "name", "artist", "added_date", "isrc", "duration_ms")
+
+    def __init__(self, spotify_id, name, artist, added_date, isrc=None, duration_ms=None):
+        self.spotify_id = spotify_id
+        self.name = name
+        self.artist = artist
+        self.added_date = added_date
+        self.isrc = isrc
+        self.duration_ms = duration_ms
+
+    @classmethod
+    def from_item(cls, playlist_track):
+        """ :return: Track for a playlist_items entry, None for removed/unavailable tracks"""
+        track = playlist_track["track"]
+        if track is None:
+            return None
+        date, time = playlist_track['added_at'].split("T")
+        date = ''.join(date.split("-"))
+        time = ''.join(time[:-1].split(":"))
+        return cls(track['uri'], track['name'], track['artists'][0]['name'], date + time,
+                   (track.get('external_ids') or {}).get('isrc'), track.get('duration_ms'))
+
+    def identity(self):
+        return self.spotify_id, self.isrc, self.artist, self.name
+
+    def history_row(self, yt_title, playlist_item_id):
+        return [self.spotify_id, self.name, self.artist, self.added_date, yt_title, playlist_item_id,
+                self.isrc, self.duration_ms]
+
+def batched(iterable, size):
+    """ Yield lists of up to size items from iterable."""
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+@metrics.timed("spotify_fetch")
+def get_playlist(sp, playlist_uri=SPOTIFY_PLAYLIST_URL):
+    """ :return: playlist name, owner name, snapshot_id"""
+    playlist = transport.call(sp.playlist, playlist_uri, fields="name,owner.display_name,snapshot_id")
+    return playlist['name'], playlist['owner']['display_name'], playlist['snapshot_id']
+
+def iter_tracks(sp, playlist_uri=SPOTIFY_PLAYLIST_URL):
+    """
+    Yield the Tracks of the playlist as their pages arrive. After the first
+    page, up to WORKERS pages are fetched in parallel at a time, so memory stays
+    flat however long the playlist is.
+    """
+    def get_page(offset):
+        return transport.call(sp.playlist_items, playlist_uri, fields=SPOTIFY_TRACK_FIELDS,
+                              limit=SPOTIFY_PAGE_SIZE, offset=offset, additional_types=("track",))
+
+    # the first page tells how many pages there are
+    with metrics.stage("spotify_fetch"):
+        pages = [get_page(0)]
+    offsets = range(SPOTIFY_PAGE_SIZE, pages[0]['total'], SPOTIFY_PAGE_SIZE)
+    windows = batched(offsets, WORKERS)
+    while pages:
+        for page in pages:
+            for playlist_track in page["items"]:
+                track = Track.from_item(playlist_track)
+                if track is not None:
+                    yield track
+        with metrics.stage("spotify_fetch"):
+            pages = list(run_concurrently(get_page, next(windows, [])))
+
+def create_playlist(youtube, title):
+    print(f'Creating "{title}".')
+    request = youtube.playlists().insert(
+        part="snippet,status",
+        body={
+          "snippet": {
+            "title": title,
+            "description": f"A playlist generated with Spotify2Youtube.",
+            "defaultLanguage": "en"
+          },
+          "status": {
+            "privacyStatus": "private"
+          }
+        }
+    )
+    created_playlist = execute(request)
+    playlist_id = created_playlist["id"]
+    username = created_playlist["snippet"]["channelTitle"]
+    return playlist_id, username
+
+def get_playlist_id(youtube, spotify_username, spotify_playlist, title=None, playlists=None, create=True):
+    """
+    :param playlists: the user's playlists if already listed, see playlist_index.list_playlists
+    :param create: create the playlist when it does not exist, otherwise return None as its id
+    """
+    title = title or f"{spotify_playlist} - by {spotify_username}"
+    existing_playlists = playlists if playlists is not None else playlist_index.list_playlists(youtube)
+
+    existing_titles = [playlist["snippet"]["title"] for playlist in existing_playlists]
+    if title in existing_titles:
+        playlist_id = existing_playlists[existing_titles.index(title)]["id"]
+        username = existing_playlists[existing_titles.index(title)]["snippet"]["channelTitle"]
+        print(f'"{title}" already exist.')
+    elif not create:
+        playlist_id = None
+        username = existing_playlists[0]["snippet"]["channelTitle"] if existing_playlists else ""
+        print(f'"{title}" would be created.')
+    else:
+        playlist_id, username = create_playlist(youtube, title)
+    return playlist_id, username
+
+def search_candidates(youtube, search_str):
+    """ :return: [(videoId, title, channelTitle)] of the top search results"""
+    request = youtube.search().list(
+        part="snippet",
+        maxResults=5,
+        q=search_str,
+        type="video"
+    )
+    response = execute(request)
+    return [(result["id"]["videoId"], result["snippet"]["title"], result["snippet"]["channelTitle"])
+            for result in response["items"]]
+
+def get_video_details(youtube, video_ids):
+    """
+    Get the duration (seconds) and view count of every video in video_ids,
+    50 ids per videos.list call. Videos that no longer exist are left out of
+    the result, hidden view counts count as 0.
+    """
+    def get_chunk(chunk):
+        request = youtube.videos().list(
+            part="contentDetails,statistics",
+            id = ",".join(chunk),
+            maxResults=VIDEOS_PER_REQUEST
+        )
+        return execute(request)["items"]
+
+    chunks = [video_ids[start:start + VIDEOS_PER_REQUEST] for start in range(0, len(video_ids), VIDEOS_PER_REQUEST)]
+    details = {}
+    for results in run_concurrently(get_chunk, chunks):
+        for result in results:
+            duration = scoring.parse_duration(result.get("contentDetails", {}).get("duration"))
+            views = int(result.get("statistics", {}).get("viewCount", 0))
+            details[result["id"]] = (duration or 0, views)
+    return details
+
+def known_video_id(track, cache, resolved=None, index=None):
+    """
+    videoId of the track that needs no search: journaled by an interrupted run,
+    in the match cache or on one of the user's playlists. None otherwise.
+    """
+    video_id = (resolved or {}).get(track.spotify_id) or cache.get(track.artist, track.name, track.spotify_id)
+    if index is not None and video_id in index.unavailable:
+        video_id = None
+    if video_id is None and index is not None:
+        video_id = index.get(track.artist, track.name)
+        if video_id is not None:
+            cache.put(track.artist, track.name, video_id, track.spotify_id)
+    return video_id
+
+@metrics.timed("search")
+def resolve_tracks(youtube, tracks, cache, resolved=None, index=None):
+    """
+    Find a videoId for every track: run the searches for the tracks missing from
+    resolved (results journaled by an interrupted run), the cache and the index
+    of the user's playlists, fetch the details of all their candidates with
+    batched videos.list calls, and score them together.
+    Returns a list aligned with tracks, None where nothing was found, and the
+    scores of every candidate.
+    """
+    video_ids = [known_video_id(track, cache, resolved, index) for track in tracks]
+    to_search = [i for i, video_id in enumerate(video_ids) if video_id is None]
+    candidates = list(run_concurrently(
+        lambda i: search_candidates(youtube, f"{tracks[i].artist} - {tracks[i].name}"), to_search))
+
+    all_candidates = list(dict.fromkeys(video_id for results in candidates for video_id, title, channel in results))
+    details = get_video_details(youtube, all_candidates)
+    if index is not None:
+        details = {video_id: detail for video_id, detail in details.items() if video_id not in index.unavailable}
+    best, scores = scoring.rank([tracks[i] for i in to_search], candidates, details)
+
+    for i, video_id in zip(to_search, best):
+        if video_id is not None:
+            cache.put(tracks[i].artist, tracks[i].name, video_id, tracks[i].spotify_id)
+        video_ids[i] = video_id
+    return video_ids, scores
+
+@metrics.timed("insert")
+def add_track(youtube, playlist_id, video_id, position=0):
+    request = youtube.playlistItems().insert(
+        part="snippet",
+        body={
+          "snippet": {
+            "playlistId": playlist_id,
+            "position": position,
+            "resourceId": {
+              "kind": "youtube#video",
+              "videoId": video_id
+            }
+          }
+        }
+    )
+    response = execute(request)
+    title = response["snippet"]["title"]
+    playlistItemId = response["id"]
+    return title, playlistItemId
+
+def missing_tracks(conn, playlist, tracks):
+    """
+    Diff the Spotify tracks against the history as they stream in and yield
+    the ones to add in chunks of SEARCH_CHUNK_SIZE. A song that is on the
+    playlist twice, even under two Spotify ids, is only yielded once.
+    """
+    chunk = []
+    for batch in batched(tracks, SPOTIFY_PAGE_SIZE):
+        with metrics.stage("diff"):
+            missing = history_store.missing_ids(conn, playlist, [track.identity() for track in batch])
+        for track in batch:
+            if track.spotify_id in missing:
+                missing.discard(track.spotify_id)
+                chunk.append(track)
+            if len(chunk) == SEARCH_CHUNK_SIZE:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+def forget_video(conn, track, video_id, cache, resolved, index=None):
+    """ Stop reusing a video YouTube refused to insert because it was deleted or blocked."""
+    cache.invalidate(track.artist, track.name, track.spotify_id)
+    resolved.pop(track.spotify_id, None)
+    if index is not None:
+        index.discard(video_id)
+    playlist_index.mark_unavailable(conn, video_id)
+
+def insert_position(conn, playlist, track, added, inserted, newest_first):
+    """
+    Position of a track in the playlist: below every track of the history added
+    on Spotify after it, and below the ones added at the same time that earlier
+    runs inserted. Of those this run inserted it goes on top, unless the tracks
+    come newest_first.
+    :param added: history rows inserted but not written to the history yet
+    :param inserted: Counter of the Added Dates of the tracks this run inserted
+    """
+    if track.added_date is None:
+        return 0
+    position = history_store.count_added_since(conn, playlist, track.added_date) \
+        + sum(row[3] is not None and row[3] >= track.added_date for row in added)
+    return position if newest_first else position - inserted[track.added_date]
+
+def add_tracks(youtube, playlist_id, chunks, conn, playlist, cache, index=None, newest_first=False):
+    """
+    Resolve the next chunk of tracks in the background while the current chunk
+    is inserted. Inserts stay sequential so the playlist order is deterministic.
+    Every track is inserted at its insert_position, so the playlist is newest
+    first whichever run adds a track.
+    :return: number of tracks added
+    """
+    resolved = journal.resolved_video_ids(conn, playlist)
+    inserted = Counter()
+    count = 0
+    try:
+        with ThreadPoolExecutor(max_workers=1) as prefetch:
+            chunk = next(chunks, None)
+            pending = prefetch.submit(resolve_tracks, youtube, chunk, cache, resolved, index) if chunk else None
+            while chunk:
+                video_ids, scores = pending.result()
+                next_chunk = next(chunks, None)
+                if next_chunk:
+                    pending = prefetch.submit(resolve_tracks, youtube, next_chunk, cache, resolved, index)
+                journal.record_searches(conn, playlist, chunk, video_ids)
+                scoring.record(conn, scores)
+                added = []
+                try:
+                    for track, video_id in zip(chunk, video_ids):
+                        if video_id is None:
+                            print(f"? {track.artist} - {track.name} (no match found)")
+                            continue
+                        entry = journal.plan_insert(conn, playlist, track, video_id)
+                        position = insert_position(conn, playlist, track, added, inserted, newest_first)
+                        try:
+                            title, playlistItemId = add_track(youtube, playlist_id, video_id, position)
+                        except googleapiclient.errors.HttpError as e:
+                            if not transport.reasons_of(e) & UNAVAILABLE_VIDEO_REASONS:
+                                raise
+                            journal.cancel_insert(conn, playlist, entry, track.spotify_id)
+                            forget_video(conn, track, video_id, cache, resolved, index)
+                            print(f"! {track.artist} - {track.name} (video {video_id} is unavailable, "
+                                  f"searched again next run)")
+                            continue
+                        journal.complete_insert(conn, entry, title, playlistItemId)
+                        added.append(track.history_row(title, playlistItemId))
+                        inserted[track.added_date] += 1
+                        print(f"+ {title}")
+                finally:
+                    history_store.add_rows(conn, playlist, added)
+                    count += len(added)
+                chunk = next_chunk
+    finally:
+        cache.save()
+    return count
+
+@metrics.timed("delete")
+def remove_tracks(youtube, to_del, conn, playlist):
+    journal.plan_deletes(conn, playlist, to_del)
+    deleted_ids = []
+    try:
+        deleted = run_concurrently(lambda row: remove_track(youtube, row["YT PlaylistItemId"]), to_del)
+        for row, playlist_item_id in zip(to_del, deleted):
+            journal.complete_delete(conn, playlist, playlist_item_id)
+            deleted_ids.append(playlist_item_id)
+            print(f"- {row['YT Title']}")
+    finally:
+        history_store.remove_items(conn, deleted_ids)
+
+def get_playlist_items(youtube, playlist_id):
+    """ videoId -> (title, playlistItemId) for every item of the playlist."""
+    return {item["snippet"]["resourceId"]["videoId"]: (item["snippet"]["title"], item["id"])
+            for item in list_playlist_items(youtube, playlist_id)}
+
+def reconcile(youtube, conn, playlist, playlist_id):
+    """
+    Compare the history with the live playlist: history rows whose video was
+    removed by hand are dropped, so the diff adds them again, and videos
+    added by hand (orphans) are reported.
+    """
+    items, changed = playlist_mirror.refresh(conn, youtube, playlist_id)
+    live = {item["id"]: item for item in items}
+    recorded = history_store.item_ids(conn, playlist)
+    stale = recorded - live.keys()
+    orphans = [live[item_id] for item_id in live.keys() - recorded]
+    history_store.remove_items(conn, stale)
+    print(f"Reconciled with {len(items)} videos on YouTube ({changed} pages changed since last check).")
+    print(f"{len(stale)} history rows without a video removed.")
+    if orphans:
+        print(f"{len(orphans)} videos are not in the history:")
+        for item in orphans:
+            print(f"  ? {item['title']} (https://www.youtube.com/watch?v={item['videoId']})")
+
+def plan_sync(conn, playlist, playlist_id, tracks, cache, index):
+    """ Diff the whole Spotify playlist into a planner.Plan, newest tracks first."""
+    plan = planner.Plan(playlist, playlist_id, SEARCH_CHUNK_SIZE)
+    resolved = journal.resolved_video_ids(conn, playlist)
+    history_store.start_diff(conn)
+    for chunk in missing_tracks(conn, playlist, tracks):
+        plan.adds += [(track, known_video_id(track, cache, resolved, index)) for track in chunk]
+    with metrics.stage("diff"):
+        plan.deletes = history_store.removed_rows(conn, playlist)
+    plan.sort()
+    return plan
+
+def connect_search_clients(owner, youtube):
+    """ Every client with quota left, authenticated, to spread the searches of a sync over."""
+    clients = {client: youtube_authentication(client) for client in ledger.available_clients() if client != owner}
+    clients[owner] = youtube
+    return clients
+
+def fan_out_searches(search_clients, plan, conn, playlist, cache, index):
+    """
+    Run the searches of the plan with every client at once, one worker per
+    client taking chunks from a shared queue until its own budget is spent.
+    The plan is first cut down to the combined quota of the clients, and the
+    quota its inserts and deletes need is kept back from the clients the sync
+    rotates through to make them, in ledger.cover order. A worker searches as
+    much of a chunk as its budget still covers and hands the rest back to the
+    workers still running. Results are journaled as they arrive, so add_tracks
+    finds every videoId without searching again. Tracks nothing was found for,
+    and tracks no client had the budget to search for, are dropped from the plan.
+    Any other error stops every worker and is raised once they are done.
+    """
+    # the remaining quota is already net of the units spent on planning
+    plan.within_budget(plan.planning_units + sum(ledger.remaining(client) for client in search_clients))
+    pending = deque(batched((track for track, video_id in plan.adds if video_id is None), SEARCH_CHUNK_SIZE))
+    reserve = len(plan.adds) * planner.INSERT_COST + len(plan.deletes) * planner.DELETE_COST
+    reserved = dict(ledger.cover(reserve)[0])
+    not_found = set()
+    busy = 0
+    failed = False
+    handed_back = threading.Condition()
+
+    def search_with(client):
+        nonlocal busy, failed
+        budget = ledger.remaining(client) - reserved.get(client, 0)
+        spent = 0
+        while True:
+            with handed_back:
+                # a busy worker may still hand back the part of a chunk it can't pay for
+                while not pending and busy and not failed:
+                    handed_back.wait()
+                if not pending or failed:
+                    return client, spent
+                chunk = pending.popleft()
+                busy += 1
+            affordable = max(0, (budget - spent - planner.VIDEOS_COST) // planner.SEARCH_COST)
+            searched, rest = chunk[:affordable], chunk[affordable:]
+            try:
+                if searched:
+                    video_ids, scores = resolve_tracks(search_clients[client], searched, cache, index=index)
+            except QuotaExceeded:
+                searched, rest = [], chunk
+            except BaseException:
+                # the waiting workers must not wait for this one to hand back its chunk
+                with handed_back:
+                    busy -= 1
+                    failed = True
+                    handed_back.notify_all()
+                raise
+            with handed_back:
+                busy -= 1
+                if searched:
+                    spent += len(searched) * planner.SEARCH_COST + planner.VIDEOS_COST
+                    journal.record_searches(conn, playlist, searched, video_ids)
+                    scoring.record(conn, scores)
+                    not_found.update(track.spotify_id for track, video_id in zip(searched, video_ids)
+                                     if video_id is None)
+                if rest:
+                    pending.appendleft(rest)
+                handed_back.notify_all()
+                if rest:
+                    return client, spent
+
+    with ThreadPoolExecutor(max_workers=len(search_clients)) as executor:
+        for client, spent in executor.map(search_with, list(search_clients)):
+            print(f"Client {client} spent {spent} units on searches.")
+
+    unsearched = {track.spotify_id for chunk in pending for track in chunk}
+    for track, video_id in plan.adds:
+        if track.spotify_id in not_found:
+            print(f"? {track.artist} - {track.name} (no match found)")
+    plan.adds = [(track, video_id) for track, video_id in plan.adds
+                 if track.spotify_id not in unsearched and track.spotify_id not in not_found]
+    plan.skipped_adds += len(unsearched)
+
+def sync(youtube, tracks, spotify_username, spotify_playlist, cache, resume=False, youtube_title=None,
+         reconcile_playlist=False, plan_file=None, budget=None, search_clients=None):
+    """
+    :param plan_file: only plan the sync and write the plan as JSON to this path or file object
+    :param budget: quota units the sync may spend, newest Spotify tracks are added first
+    :param search_clients: client index -> youtube of the clients to spread the searches over,
+     youtube among them; inserts and deletes only go through youtube
+    :return: True when the YouTube playlist is in sync with Spotify
+    """
+    # units spent before the plan is made count towards the budget
+    used_before = ledger.used_total()
+    # find/create youtube playlist
+    playlists = playlist_index.list_playlists(youtube)
+    playlist_id, youtube_username = get_playlist_id(youtube, spotify_username, spotify_playlist, youtube_title,
+                                                    playlists, create=plan_file is None)
+    playlist = history_store.playlist_key(spotify_username, spotify_playlist, youtube_username)
+
+    # find existing tracks, importing the old CSV history on first use
+    conn = history_store.connect()
+    journal.init(conn)
+    scoring.init(conn)
+    playlist_index.init(conn)
+    history_store.import_csv(conn, playlist, f"history/{playlist}.csv")
+
+    # finish the bookkeeping of an interrupted run before diffing
+    if not journal.is_empty(conn, playlist):
+        if not resume:
+            print("An earlier sync of this playlist was interrupted. Run again with --resume.")
+            quit()
+        repaired = journal.replay(conn, playlist, lambda: get_playlist_items(youtube, playlist_id))
+        print(f"Resumed interrupted sync ({repaired} history rows repaired).")
+
+    # repair drift caused by editing the YouTube playlist by hand
+    if reconcile_playlist and playlist_id is not None:
+        reconcile(youtube, conn, playlist, playlist_id)
+
+    # videos the user's playlists already hold are reused before searching
+    with metrics.stage("index"):
+        index = playlist_index.build(conn, youtube, playlists)
+    print(f"{len(index)} videos indexed from {len(playlists)} playlists.")
+
+    if plan_file is not None or budget is not None or search_clients:
+        plan = plan_sync(conn, playlist, playlist_id, tracks, cache, index)
+        plan.planning_units = ledger.used_total() - used_before
+        if budget is not None:
+            plan.within_budget(budget)
+        if plan_file is not None:
+            if isinstance(plan_file, str):
+                with open(plan_file, "w") as f:
+                    f.write(plan.to_json())
+                print(f"Plan written to {plan_file}.")
+            else:
+                print(plan.to_json(), file=plan_file)
+            return False
+        if search_clients:
+            fan_out_searches(search_clients, plan, conn, playlist, cache, index)
+        added = add_tracks(youtube, playlist_id, batched((track for track, video_id in plan.adds), SEARCH_CHUNK_SIZE),
+                           conn, playlist, cache, index, newest_first=True)
+        to_del = plan.deletes
+        remove_tracks(youtube, to_del, conn, playlist)
+        journal.clear(conn, playlist)
+        print("\n==================================")
+        print(f"{added} new tracks added, {plan.skipped_adds} left for a later run.")
+        print(f"{len(to_del)} old tracks deleted, {plan.skipped_deletes} left for a later run.")
+        return not (plan.skipped_adds or plan.skipped_deletes)
+
+    # add new tracks as the spotify pages arrive, reusing videoIds matched by earlier runs
+    history_store.start_diff(conn)
+    added = add_tracks(youtube, playlist_id, missing_tracks(conn, playlist, tracks), conn, playlist, cache, index)
+
+    # remove deleted tracks, known once every spotify track was seen
+    with metrics.stage("diff"):
+        to_del = history_store.removed_rows(conn, playlist)
+    remove_tracks(youtube, to_del, conn, playlist)
+    journal.clear(conn, playlist)
+    print("\n==================================")
+    print(f"{added} new tracks added.")
+    print(f"{len(to_del)} old tracks deleted.")
+    return True
+
+def run(args):
+    if args.plan == "-":
+        # stdout carries the plan alone so it can be piped into jq, the status lines go to stderr
+        plan_output = sys.stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            return run_sync(args, plan_output)
+    return run_sync(args, args.plan)
+
+def run_sync(args, plan_file):
+    """ :param plan_file: args.plan, with "-" replaced by the stream the plan is written to"""
+    atexit.register(metrics.write)
+    playlist_uri = args.playlist or SPOTIFY_PLAYLIST_URL
+
+    # skip the playlist when it is unchanged since the last sync
+    conn = history_store.connect()
+    known_snapshot_id = None if args.resume or args.reconcile else history_store.get_snapshot(conn, playlist_uri)
+    sp = spotify_authentication()
+    spotify_playlist, spotify_username, snapshot_id = get_playlist(sp, playlist_uri)
+    if snapshot_id == known_snapshot_id:
+        print(f'"{spotify_playlist}" is unchanged since the last sync.')
+        quit()
+    # a dry run spends no insert/delete quota and needs no confirmation
+    while plan_file is None:
+        print(f"""
+Playlist information:
+    Created by = {spotify_username}
+    Title = {spotify_playlist}
+
+Confirm conversion? [y/n]""")
+        confirmation = str(input()).lower()
+        if confirmation == "n":
+            quit()
+        elif confirmation == "y":
+            break
+
+    available_client = get_available_client()
+    logging.getLogger('googleapiclient.discovery_cache').setLevel(logging.ERROR)
+    logging.getLogger('googleapiclient.http').setLevel(logging.ERROR)
+    cache = MatchCache()
+    used_before = ledger.used_total()
+    while True:
+        try:
+            # Youtube login
+            youtube = youtube_authentication(available_client)
+            search_clients = connect_search_clients(available_client, youtube) if args.fan_out else None
+            # the budget covers every client the sync rotates through
+            budget = None if args.budget is None else max(0, args.budget - (ledger.used_total() - used_before))
+            # tracks are streamed from spotify again on every attempt, already added ones are skipped by the diff
+            in_sync = sync(youtube, iter_tracks(sp, playlist_uri), spotify_username, spotify_playlist, cache,
+                           resume=args.resume, reconcile_playlist=args.reconcile, plan_file=plan_file, budget=budget,
+                           search_clients=search_clients)
+            if in_sync:
+                history_store.save_snapshot(conn, playlist_uri, snapshot_id)
+            break
+        except QuotaExceeded:
+            # history, journal and match cache are written as we go, so the next client picks up where this one stopped
+            print("\n==================================\n")
+            print(f"Quota for Client {available_client} is used up.")
+            available_client = get_available_client()
+            args.resume = True
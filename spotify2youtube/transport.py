@@ -0,0 +1,164 @@
+"""
+The HTTP transport shared by the YouTube Data API clients, Spotify and the
+Chromecast lounge session. All of them send their requests over one
+requests.Session, whose connection pool keeps connections to each host alive
+between requests and can be used from many threads at once.
+
+Failed requests are classified into quota, rate limit, transient and fatal
+errors from their status and the reasons in their JSON error body, and are
+retried with one backoff policy.
+"""
+import itertools
+import json
+import random
+import threading
+import time
+
+import httplib2
+import requests
+import requests.adapters
+import urllib3.exceptions
+
+POOL_SIZE = 16              # keep-alive connections per host, at least api.WORKERS
+TIMEOUT = 30                # seconds to connect and between bytes of a response
+MAX_RETRIES = 5
+MAX_BACKOFF = 32            # seconds
+
+QUOTA = "quota"
+RATE_LIMIT = "rate_limit"
+TRANSIENT = "transient"
+FATAL = "fatal"
+RETRYABLE = (RATE_LIMIT, TRANSIENT)
+
+# reasons of https://developers.google.com/youtube/v3/docs/core_errors
+QUOTA_REASONS = {"quotaExceeded", "dailyLimitExceeded", "dailyLimitExceededUnreg"}
+RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded", "RATE_LIMIT_EXCEEDED"}
+TRANSIENT_REASONS = {"backendError", "internalError"}
+TRANSIENT_STATUSES = {500, 502, 503, 504}
+CONNECTION_ERRORS = (requests.ConnectionError, requests.Timeout, ConnectionError, TimeoutError)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def session():
+    """ The process-wide pooled session, created on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+
+class PooledHttp:
+    """
+    The httplib2.Http interface googleapiclient and google_auth_httplib2 call,
+    sent over the pooled session. Unlike httplib2.Http one instance can be
+    shared by all worker threads.
+    """
+
+    def __init__(self, timeout=TIMEOUT):
+        self.timeout = timeout
+        self.follow_redirects = True
+        self.redirect_codes = frozenset({300, 301, 302, 303, 307, 308})
+        self.connections = {}
+
+    def request(self, uri, method="GET", body=None, headers=None, redirections=httplib2.DEFAULT_MAX_REDIRECTS,
+                connection_type=None, **kwargs):
+        response = session().request(method, uri, data=body, headers=headers, timeout=self.timeout,
+                                     allow_redirects=self.follow_redirects)
+        info = dict(response.headers)
+        # requests already decoded the body, as httplib2 does
+        if "Content-Encoding" in info:
+            info["-content-encoding"] = info.pop("Content-Encoding")
+        info["status"] = response.status_code
+        resp = httplib2.Response(info)
+        resp.reason = response.reason
+        return resp, response.content
+
+    def close(self):
+        pass
+
+
+def status_of(error):
+    """ HTTP status of a googleapiclient HttpError, requests HTTPError or SpotifyException."""
+    resp = getattr(error, "resp", None)
+    if resp is not None:
+        return resp.status
+    response = getattr(error, "response", None)
+    if response is not None:
+        return response.status_code
+    return getattr(error, "http_status", None)
+
+
+def reasons_of(error):
+    """ The error reasons of a Google style JSON error body: errors[].reason and details[].reason."""
+    content = getattr(error, "content", None)
+    if content is None:
+        response = getattr(error, "response", None)
+        content = getattr(response, "content", None) if response is not None else None
+    try:
+        body = json.loads(content)["error"]
+        return {entry["reason"] for entry in body.get("errors", []) + body.get("details", []) if "reason" in entry}
+    except (TypeError, ValueError, KeyError, AttributeError):
+        return set()
+
+
+def classify(error):
+    """ :return: QUOTA, RATE_LIMIT, TRANSIENT or FATAL"""
+    if isinstance(error, CONNECTION_ERRORS):
+        return TRANSIENT
+    status = status_of(error)
+    reasons = reasons_of(error)
+    if reasons & QUOTA_REASONS:
+        return QUOTA
+    if status == 429 or reasons & RATE_LIMIT_REASONS:
+        return RATE_LIMIT
+    if status in TRANSIENT_STATUSES or reasons & TRANSIENT_REASONS:
+        return TRANSIENT
+    return FATAL
+
+
+def never_sent(error):
+    """ Whether the request failed before a connection to the server was made."""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    if isinstance(error, requests.ConnectionError) and error.args:
+        return isinstance(getattr(error.args[0], "reason", error.args[0]), urllib3.exceptions.NewConnectionError)
+    return False
+
+
+def should_retry(kind, attempt, max_retries=MAX_RETRIES, idempotent=True, error=None):
+    """
+    Rate limited requests were refused by the server and can always be sent
+    again. A transient error may hit a request the server already applied, so
+    a request that is not idempotent is only sent again when it never went out.
+    """
+    if kind not in RETRYABLE or attempt >= max_retries:
+        return False
+    return kind == RATE_LIMIT or idempotent or never_sent(error)
+
+
+def backoff(attempt, error=None):
+    """ Seconds to wait after the failed attempt: the server's Retry-After, else exponential with jitter."""
+    headers = getattr(error, "resp", None) or getattr(error, "headers", None) \
+        or getattr(getattr(error, "response", None), "headers", None) or {}
+    retry_after = headers.get("retry-after") or headers.get("Retry-After")
+    try:
+        return min(float(retry_after), MAX_BACKOFF * 2)
+    except (TypeError, ValueError):
+        return min(2 ** attempt, MAX_BACKOFF) + random.random()
+
+
+def call(func, *args, max_retries=MAX_RETRIES, **kwargs):
+    """ Call func, retrying rate limit and transient errors with backoff."""
+    for attempt in itertools.count():
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            if not should_retry(classify(e), attempt, max_retries):
+                raise
+            time.sleep(backoff(attempt, e))
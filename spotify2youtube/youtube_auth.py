@@ -0,0 +1,90 @@
+import json
+import os
+
+import google_auth_httplib2
+import google_auth_oauthlib.flow
+import googleapiclient.discovery
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+
+from . import transport
+
+SCOPES = ["https://www.googleapis.com/auth/youtube.force-ssl"]
+API_SERVICE_NAME = "youtube"
+API_VERSION = "v3"
+DISCOVERY_URL = "https://www.googleapis.com/discovery/v1/apis/youtube/v3/rest"
+DISCOVERY_FILE = "client_secrets/youtube_v3_discovery.json"
+
+
+def client_secrets_file(client):
+    return f"client_secrets/CLIENT_SECRET{client}.json"
+
+
+def token_file(client):
+    return f"client_secrets/token{client}.json"
+
+
+def get_credentials(client):
+    """
+    Load the stored credentials of the client, refreshing them silently when
+    they expired. The browser consent flow only runs when there is no usable
+    refresh token.
+    """
+    credentials = None
+    if os.path.exists(token_file(client)):
+        credentials = Credentials.from_authorized_user_file(token_file(client), SCOPES)
+    if credentials and credentials.valid:
+        return credentials
+    if credentials and credentials.expired and credentials.refresh_token:
+        try:
+            credentials.refresh(Request(session=transport.session()))
+        except Exception as e:
+            print(f"Refreshing the token of Client {client} failed ({e}), signing in again.")
+            credentials = None
+    else:
+        credentials = None
+
+    if credentials is None:
+        # Disable OAuthlib's HTTPS verification when running locally.
+        # *DO NOT* leave this option enabled in production.
+        os.environ["OAUTHLIB_INSECURE_TRANSPORT"] = "1"
+        flow = google_auth_oauthlib.flow.InstalledAppFlow.from_client_secrets_file(
+            client_secrets_file(client), SCOPES)
+        # offline access returns a refresh token so later runs need no browser
+        credentials = flow.run_local_server(access_type="offline", prompt="consent")
+
+    with open(token_file(client), "w") as f:
+        f.write(credentials.to_json())
+    return credentials
+
+
+def discovery_document():
+    """ The YouTube discovery document, downloaded once and then read from DISCOVERY_FILE."""
+    try:
+        with open(DISCOVERY_FILE, "r") as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+    try:
+        from googleapiclient.discovery_cache import get_static_doc
+        document = get_static_doc(API_SERVICE_NAME, API_VERSION)
+    except ImportError:
+        document = None
+    if document is None:
+        response = transport.session().get(DISCOVERY_URL, timeout=transport.TIMEOUT)
+        response.raise_for_status()
+        document = response.text
+    json.loads(document)    # don't cache a broken document
+    with open(DISCOVERY_FILE, "w") as f:
+        f.write(document)
+    return document
+
+
+def youtube_authentication(available_client):
+    credentials = get_credentials(available_client)
+    # tag the connection so api.execute can charge requests to this client's quota;
+    # all clients and worker threads share the transport's connection pool
+    http = google_auth_httplib2.AuthorizedHttp(credentials, http=transport.PooledHttp())
+    http.client_index = available_client
+    youtube = googleapiclient.discovery.build_from_document(discovery_document(), http=http)
+    return youtube
@@ -0,0 +1,219 @@
+import pychromecast
+from pychromecast.controllers.youtube import YouTubeController
+from casttube import YouTubeSession
+import time
+
+import requests
+
+from . import transport
+from .bind_channel import ChunkParser
+
+YOUTUBE_BASE_URL = "https://www.youtube.com/"
+BIND_URL = YOUTUBE_BASE_URL + "api/lounge/bc/bind"
+LOUNGE_TOKEN_URL = YOUTUBE_BASE_URL + "api/lounge/pairing/get_lounge_token_batch"
+QUEUE_AJAX_URL = YOUTUBE_BASE_URL + "watch_queue_ajax"
+
+HEADERS = {"Origin": YOUTUBE_BASE_URL, "Content-Type": "application/x-www-form-urlencoded"}
+LOUNGE_ID_HEADER = "X-YouTube-LoungeId-Token"
+REQ_PREFIX = "req{req_id}"
+
+WATCH_QUEUE_ITEM_CLASS = 'yt-uix-scroller-scroll-unit watch-queue-item'
+GSESSION_ID_REGEX = '"S","(.*?)"]'
+SID_REGEX = '"c","(.*?)",\"'
+
+CURRENT_INDEX = "_currentIndex"
+CURRENT_TIME = "_currentTime"
+AUDIO_ONLY = "_audioOnly"
+VIDEO_ID = "_videoId"
+VIDEO_IDS = "_videoIds"
+LIST_ID = "_listId"
+ACTION = "__sc"
+COUNT = "count"
+OFS = "ofs"
+
+ACTION_SET_PLAYLIST = "setPlaylist"
+ACTION_CLEAR = "clearPlaylist"
+ACTION_REMOVE = "removeVideo"
+ACTION_INSERT = "insertVideo"
+ACTION_ADD = "addVideo"
+ACTION_GET_QUEUE_ITEMS = "action_get_watch_queue_items"
+
+GSESSIONID = "gsessionid"
+LOUNGEIDTOKEN = "loungeIdToken"
+CVER = "CVER"
+TYPE = "TYPE"
+RID = "RID"
+SID = "SID"
+VER = "VER"
+AID = "AID"
+CI = "CI"
+
+QUEUE_BATCH_SIZE = 25    # queue actions sent in one bind request
+SESSION_RETRIES = 4      # attempts of a session data request before giving up
+SESSION_ERROR_STATUSES = {400, 401, 403, 404}     # expired lounge token or SID, renewed before the next attempt
+LOUNGE_TOKEN_MARGIN = 60    # seconds before its expiration a lounge token is renewed
+
+BIND_DATA = {"device": "REMOTE_CONTROL", "id": "aaaaaaaaaaaaaaaaaaaaaaaaaa", "name": "Python",
+             "mdx-version": 3, "pairing_type": "cast", "app": "android-phone-13.14.55"}
+
+
+class YouTubeSession(YouTubeSession):
+    def play_videos(self, video_ids, start_time="0"):
+        """
+        Replace the queue with video_ids and start playing the first one,
+        in a single setPlaylist request.
+        :param video_ids: list of YouTube video ids
+        :param start_time: starting time of the first video in seconds
+        """
+        self._start_session()
+        request_data = {LIST_ID: "",
+                        ACTION: ACTION_SET_PLAYLIST,
+                        CURRENT_TIME: start_time,
+                        CURRENT_INDEX: 0,
+                        AUDIO_ONLY: "false",
+                        VIDEO_ID: video_ids[0],
+                        VIDEO_IDS: ",".join(video_ids),
+                        COUNT: 1, }
+        self._post_session_data(self._format_session_params(request_data))
+
+    def add_videos(self, video_ids):
+        """
+        Add video_ids to the end of the play queue. Up to QUEUE_BATCH_SIZE
+        addVideo actions share one request and the session is only bound once
+        for all of them. As in every BrowserChannel request, the actions are
+        numbered req0_ to req{count - 1}_ and ofs is the number of actions the
+        session received before them.
+        :param video_ids: list of YouTube video ids
+        """
+        if not self.in_session:
+            self._start_session()
+        else:
+            self._bind()
+        for start in range(0, len(video_ids), QUEUE_BATCH_SIZE):
+            batch = video_ids[start:start + QUEUE_BATCH_SIZE]
+            request_data = {COUNT: len(batch), OFS: self._req_count}
+            for i, video_id in enumerate(batch):
+                request_data.update({REQ_PREFIX.format(req_id=i) + ACTION: ACTION_ADD,
+                                     REQ_PREFIX.format(req_id=i) + VIDEO_ID: video_id})
+            self._post_session_data(request_data, len(batch))
+
+    def _post_session_data(self, request_data, actions=1):
+        url_params = {SID: self._sid, GSESSIONID: self._gsession_id, RID: self._rid, VER: 8, CVER: 1}
+        self._do_post(BIND_URL, data=request_data, headers={LOUNGE_ID_HEADER: self._lounge_token},
+                      session_request=True, params=url_params, actions=actions)
+
+    def __init__(self, screen_id):
+        super().__init__(screen_id)
+        self._http = transport.session()    # keep-alive connections shared with the API clients
+        self._lounge_token_expiration = 0
+
+    def ensure_session(self):
+        """ Start a session unless the current lounge token and SID are still usable."""
+        if not self.in_session or time.time() > self._lounge_token_expiration - LOUNGE_TOKEN_MARGIN:
+            self._start_session()
+
+    def get_session_data(self):
+        """
+        Get data about the current active session using an xmlhttp request.
+        The lounge token and SID are reused; an expired SID is rebound by
+        _do_post and an expired lounge token starts a new session. Failed
+        requests and unparseable responses are retried with the transport's
+        backoff, SESSION_RETRIES times at most.
+        Public API only: cast follows the queue with StatusMediaListener and
+        does not poll the session.
+        :return: List of session attributes
+        """
+        for attempt in range(SESSION_RETRIES):
+            self.ensure_session()
+            url_params = {LOUNGEIDTOKEN: self._lounge_token, VER: 8, "v": 2, RID: "rpc", SID: self._sid,
+                          GSESSIONID: self._gsession_id, TYPE: "xmlhttp", "t": 1, AID: 5, CI: 1}
+            url_params.update(BIND_DATA)
+            try:
+                response = self._do_post(BIND_URL, headers={LOUNGE_ID_HEADER: self._lounge_token},
+                                         session_request=True, params=url_params, stream=True, actions=0)
+                parser = ChunkParser()
+                response.encoding = response.encoding or "utf-8"
+                with response:
+                    for text in response.iter_content(chunk_size=None, decode_unicode=True):
+                        parser.feed(text)
+                return [v for chunk in parser.chunks for k, v in chunk]
+            except (requests.RequestException, ValueError) as e:
+                status = transport.status_of(e)
+                if status in (401, 403):
+                    # the lounge token expired, get a new one on the next attempt
+                    self._lounge_token_expiration = 0
+                # _do_post rebinds an expired SID on 400/404, a chunk that doesn't parse is worth another try
+                if status in SESSION_ERROR_STATUSES or not isinstance(e, requests.RequestException):
+                    kind = transport.TRANSIENT
+                else:
+                    kind = transport.classify(e)
+                if not transport.should_retry(kind, attempt, SESSION_RETRIES - 1):
+                    raise
+                time.sleep(transport.backoff(attempt, e))
+
+    def _get_lounge_id(self):
+        data = {"screen_ids": self._screen_id}
+        response = self._do_post(LOUNGE_TOKEN_URL, data=data)
+        screen = response.json()["screens"][0]
+        self._lounge_token = screen["loungeToken"]
+        # milliseconds since the epoch
+        self._lounge_token_expiration = int(screen["expiration"]) / 1000 if "expiration" in screen else float("inf")
+
+    def _do_post(self, url, data=None, params=None, headers=None, session_request=False, stream=False, actions=1):
+        """
+        casttube's _do_post, sent over the session's keep-alive connection.
+        :param actions: number of reqN_ actions in data, counted towards the next request's ofs
+        """
+        if headers:
+            headers = dict(**dict(HEADERS, **headers))
+        else:
+            headers = HEADERS
+        response = self._http.post(url, headers=headers, data=data, params=params, stream=stream)
+        if stream and not response.ok:
+            # read the short error body and close, so the connection goes back to the pool before rebinding
+            response.content
+            response.close()
+        # 404 resets the sid, session counters
+        # 400 in session probably means bad sid
+        if (response.status_code == 404 or response.status_code == 400) and session_request:
+            self._bind()
+        response.raise_for_status()
+        if session_request:
+            self._req_count += actions
+        self._rid += 1
+        return response
+
+
+class YouTubeController(YouTubeController):
+    def start_session_if_none(self):
+        """
+        Starts a session it is not yet initialized.
+        """
+        if not (self._screen_id and self._session):
+            self.update_screen_id()
+            self._session = YouTubeSession(screen_id=self._screen_id)
+
+    def play_videos(self, video_ids):
+        """
+        Play video_ids now, replacing the current queue.
+        :param video_ids: list of YouTube video ids
+        """
+        self.start_session_if_none()
+        self._session.play_videos(video_ids)
+
+    def add_videos(self, video_ids):
+        """
+        Add video_ids to the end of the play queue in as few requests as possible.
+        :param video_ids: list of YouTube video ids
+        """
+        self.start_session_if_none()
+        self._session.add_videos(video_ids)
+
+    def init_session(self):
+        self.start_session_if_none()
+        self._session.ensure_session()
+
+    def get_session_data(self):
+        """ Session attributes, reusing the session instead of starting a new one per call."""
+        self.start_session_if_none()
+        return self._session.get_session_data()
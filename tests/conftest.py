@@ -0,0 +1,18 @@
+import pytest
+
+from spotify2youtube import history_store
+from spotify2youtube import journal
+from spotify2youtube.sync import Track
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = history_store.connect(str(tmp_path / "history.db"))
+    journal.init(conn)
+    yield conn
+    conn.close()
+
+
+def make_track(spotify_id, name="Track", artist="Artist", added_date="20240101000000", isrc=None,
+               duration_ms=None):
+    return Track(spotify_id, name, artist, added_date, isrc, duration_ms)
@@ -0,0 +1,47 @@
+import json
+
+from spotify2youtube.bind_channel import ChunkParser
+
+CHUNKS = [[[0, ["c", "sid", "", 8]], [1, ["S", "gsession"]]],
+          [[2, ["nowPlaying", {"videoId": "abc", "title": "Café 🎵 Ünïcode"}]]],
+          [[3, ["noop"]]]]
+
+
+def encode(chunks):
+    """ The bind response, chunk lengths counted in UTF-16 units like the server does."""
+    text = ""
+    for chunk in chunks:
+        payload = json.dumps(chunk, ensure_ascii=False)
+        text += f"{len(payload.encode('utf-16-le')) // 2}\n{payload}"
+    return text
+
+
+def test_feed_whole_response():
+    parser = ChunkParser()
+    parser.feed(encode(CHUNKS))
+    assert parser.chunks == CHUNKS
+
+
+def test_feed_in_pieces_of_any_size():
+    text = encode(CHUNKS)
+    for size in (1, 2, 3, 7, 64):
+        parser = ChunkParser()
+        for start in range(0, len(text), size):
+            parser.feed(text[start:start + size])
+        assert parser.chunks == CHUNKS, size
+
+
+def test_incomplete_chunk_waits_for_the_rest():
+    text = encode(CHUNKS[1:2])
+    # cut the last character off, which the emoji makes one character short of the UTF-16 length
+    parser = ChunkParser()
+    parser.feed(text[:-1])
+    assert parser.chunks == []
+    parser.feed(text[-1:])
+    assert parser.chunks == CHUNKS[1:2]
+
+
+def test_surrounding_whitespace():
+    parser = ChunkParser()
+    parser.feed("\n" + encode(CHUNKS[:1]) + "\n")
+    assert parser.chunks == CHUNKS[:1]
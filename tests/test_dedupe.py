@@ -0,0 +1,38 @@
+from spotify2youtube.dedupe import find_duplicates
+
+
+def item(item_id, video_id, title, channel):
+    return {"id": item_id, "snippet": {"resourceId": {"videoId": video_id}, "title": title,
+                                       "videoOwnerChannelTitle": channel}}
+
+
+def duplicate_ids(items, identities):
+    return [duplicate["id"] for duplicate in find_duplicates(items, identities)]
+
+
+def test_same_video_twice():
+    items = [item("i1", "v1", "Home", "Artist A - Topic"), item("i2", "v1", "Home", "Artist A - Topic")]
+    assert duplicate_ids(items, {}) == ["i2"]
+
+
+def test_different_songs_sharing_a_title():
+    items = [item("i1", "v1", "Home", "Artist A - Topic"), item("i2", "v2", "Home", "Artist B - Topic")]
+    identities = {"i1": ("spotify:track:1", "ISRC1", "artist a - home"),
+                  "i2": ("spotify:track:2", "ISRC2", "artist b - home")}
+    assert duplicate_ids(items, identities) == []
+    assert duplicate_ids(items, {}) == []
+
+
+def test_same_song_as_different_videos():
+    items = [item("i1", "v1", "Home", "Artist A - Topic"), item("i2", "v2", "Home (Official Video)", "ArtistA"),
+             item("i3", "v3", "Home (Remastered)", "Artist A - Topic")]
+    identities = {"i1": ("spotify:track:1", "ISRC1", "artist a - home"),
+                  "i2": ("spotify:track:2", "ISRC1", "artist a - home official video"),
+                  "i3": ("spotify:track:3", "ISRC3", "artist a - home")}
+    assert duplicate_ids(items, identities) == ["i2", "i3"]
+
+
+def test_items_without_history_match_title_and_channel():
+    items = [item("i1", "v1", "Home", "Artist A - Topic"), item("i2", "v2", "HOME", "Artist A - Topic"),
+             item("i3", "v3", "Home", "Artist B - Topic")]
+    assert duplicate_ids(items, {"i1": ("spotify:track:1", None, "artist a - home")}) == ["i2"]
@@ -0,0 +1,100 @@
+import threading
+import time
+
+import googleapiclient.errors
+import httplib2
+import pytest
+
+from spotify2youtube import journal
+from spotify2youtube import planner
+from spotify2youtube import scoring
+from spotify2youtube import sync
+from spotify2youtube.quota import QuotaLedger
+
+from conftest import make_track
+
+PLAYLIST = "user-playlist-youtube"
+CLIENTS = 3
+
+
+@pytest.fixture
+def ledger(tmp_path, monkeypatch):
+    """ A scratch ledger with CLIENTS configured clients, never the real one."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "client_secrets").mkdir()
+    for client in range(CLIENTS):
+        (tmp_path / "client_secrets" / f"CLIENT_SECRET{client}.json").write_text("{}")
+    ledger = QuotaLedger(str(tmp_path / "client_secrets" / "quota_ledger.json"))
+    monkeypatch.setattr(sync, "ledger", ledger)
+    return ledger
+
+
+def make_plan(size):
+    plan = planner.Plan(PLAYLIST, "PL1", sync.SEARCH_CHUNK_SIZE)
+    plan.adds = [(make_track(f"spotify:track:{i}", f"Track {i}"), None) for i in range(size)]
+    return plan
+
+
+def fake_resolve(ledger, searched_by, fail_client=None, not_found=(), latency=0.0):
+    """ resolve_tracks charging the ledger of the client it is called with."""
+    lock = threading.Lock()
+
+    def resolve_tracks(youtube, tracks, cache, resolved=None, index=None):
+        if youtube == fail_client:
+            raise googleapiclient.errors.HttpError(httplib2.Response({"status": 400}), b"{}")
+        time.sleep(latency)
+        with lock:
+            for track in tracks:
+                ledger.charge(youtube, "search.list")
+                searched_by[track.spotify_id] = youtube
+            ledger.charge(youtube, "videos.list")
+        return [None if track.spotify_id in not_found else f"video-{track.spotify_id}" for track in tracks], []
+    return resolve_tracks
+
+
+def fan_out(conn, plan):
+    scoring.init(conn)
+    sync.fan_out_searches({client: client for client in range(CLIENTS)}, plan, conn, PLAYLIST, None, None)
+
+
+def test_fan_out_searches_with_every_client(conn, ledger, monkeypatch):
+    searched_by = {}
+    monkeypatch.setattr(sync, "resolve_tracks", fake_resolve(ledger, searched_by, not_found={"spotify:track:3"}))
+    plan = make_plan(6 * sync.SEARCH_CHUNK_SIZE)
+    fan_out(conn, plan)
+
+    assert len(searched_by) == 6 * sync.SEARCH_CHUNK_SIZE
+    assert "spotify:track:3" not in {track.spotify_id for track, video_id in plan.adds}
+    assert len(plan.adds) == len(searched_by) - 1
+    assert len(journal.resolved_video_ids(conn, PLAYLIST)) == len(searched_by) - 1
+
+
+def test_fan_out_keeps_quota_for_the_inserts(conn, ledger, monkeypatch):
+    ledger.daily_quota = 1000
+    searched_by = {}
+    monkeypatch.setattr(sync, "resolve_tracks", fake_resolve(ledger, searched_by))
+    plan = make_plan(100)
+    fan_out(conn, plan)
+
+    # every search and every insert of the plan is paid for by some client
+    inserts = len(plan.adds) * planner.INSERT_COST
+    assert 0 < len(plan.adds) == len(searched_by)
+    assert sum(ledger.remaining(client) for client in range(CLIENTS)) >= inserts
+    assert plan.skipped_adds == 100 - len(plan.adds)
+
+
+def test_fan_out_error_stops_every_worker(conn, ledger, monkeypatch):
+    monkeypatch.setattr(sync, "resolve_tracks", fake_resolve(ledger, {}, fail_client=1, latency=0.01))
+    errors = []
+
+    def run():
+        try:
+            fan_out(conn, make_plan(6 * sync.SEARCH_CHUNK_SIZE))
+        except googleapiclient.errors.HttpError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+    assert not thread.is_alive(), "fan-out workers hung after an error"
+    assert len(errors) == 1
@@ -0,0 +1,74 @@
+from spotify2youtube import history_store
+
+from conftest import make_track
+
+PLAYLIST = "user-playlist-youtube"
+
+
+def add_history(conn, *tracks, playlist=PLAYLIST):
+    history_store.add_rows(conn, playlist, [track.history_row(f"{track.name} video", f"item-{track.spotify_id}")
+                                            for track in tracks])
+
+
+def diff(conn, *tracks, playlist=PLAYLIST):
+    history_store.start_diff(conn)
+    return history_store.missing_ids(conn, playlist, [track.identity() for track in tracks])
+
+
+def test_missing_ids_new_track(conn):
+    add_history(conn, make_track("spotify:track:1", "One"))
+    missing = diff(conn, make_track("spotify:track:1", "One"), make_track("spotify:track:2", "Two"))
+    assert missing == {"spotify:track:2"}
+
+
+def test_missing_ids_matches_relinked_isrc(conn):
+    add_history(conn, make_track("spotify:track:1", "One", isrc="ISRC1"))
+    assert diff(conn, make_track("spotify:track:relinked", "One (Remastered)", isrc="ISRC1")) == set()
+
+
+def test_missing_ids_matches_canonical_key(conn):
+    add_history(conn, make_track("spotify:track:1", "Song (feat. Someone)", "The Band", isrc="ISRC1"))
+    assert diff(conn, make_track("spotify:track:rerelease", "song", "the band", isrc="ISRC9")) == set()
+
+
+def test_missing_ids_ignores_other_playlists(conn):
+    add_history(conn, make_track("spotify:track:1", "One"), playlist="other")
+    assert diff(conn, make_track("spotify:track:1", "One")) == {"spotify:track:1"}
+
+
+def test_missing_ids_streamed_in_batches_reports_each_song_once(conn):
+    history_store.start_diff(conn)
+    first = history_store.missing_ids(conn, PLAYLIST, [make_track("spotify:track:1", "One").identity()])
+    second = history_store.missing_ids(conn, PLAYLIST, [make_track("spotify:track:1", "One").identity(),
+                                                        make_track("spotify:track:2", "One").identity(),
+                                                        make_track("spotify:track:3", "Three").identity()])
+    assert first == {"spotify:track:1"}
+    assert second == {"spotify:track:3"}
+
+
+def test_removed_rows(conn):
+    add_history(conn, make_track("spotify:track:1", "One"), make_track("spotify:track:2", "Two"))
+    diff(conn, make_track("spotify:track:1", "One"))
+    removed = history_store.removed_rows(conn, PLAYLIST)
+    assert [row["Spotify Id"] for row in removed] == ["spotify:track:2"]
+    assert removed[0]["YT PlaylistItemId"] == "item-spotify:track:2"
+
+
+def test_removed_rows_matches_isrc_and_canonical_key(conn):
+    add_history(conn, make_track("spotify:track:1", "One", isrc="ISRC1"),
+                make_track("spotify:track:2", "Two", isrc="ISRC2"),
+                make_track("spotify:track:3", "Three", isrc="ISRC3"),
+                make_track("spotify:track:4", "Four", isrc="ISRC4"))
+    diff(conn, make_track("spotify:track:1", "One", isrc="ISRC1"),
+         make_track("spotify:track:relinked", "Two (Remastered)", isrc="ISRC2"),
+         make_track("spotify:track:rerelease", "three", isrc="ISRC9"))
+    removed = history_store.removed_rows(conn, PLAYLIST)
+    assert [row["Spotify Id"] for row in removed] == ["spotify:track:4"]
+    assert removed[0]["YT PlaylistItemId"] == "item-spotify:track:4"
+
+
+def test_removed_rows_after_empty_diff(conn):
+    add_history(conn, make_track("spotify:track:1", "One"))
+    add_history(conn, make_track("spotify:track:2", "Two"), playlist="other")
+    diff(conn)
+    assert [row["Spotify Id"] for row in history_store.removed_rows(conn, PLAYLIST)] == ["spotify:track:1"]
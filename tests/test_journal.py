@@ -0,0 +1,75 @@
+import pytest
+
+from spotify2youtube import history_store
+from spotify2youtube import journal
+
+from conftest import make_track
+
+PLAYLIST = "user-playlist-youtube"
+
+
+def history_items(conn):
+    return history_store.item_ids(conn, PLAYLIST)
+
+
+def no_live_items():
+    pytest.fail("live items listed without unfinished inserts")
+
+
+def test_replay_adds_finished_inserts(conn):
+    track = make_track("spotify:track:1", "One", isrc="ISRC1", duration_ms=200000)
+    journal.record_searches(conn, PLAYLIST, [track], ["video1"])
+    entry_id = journal.plan_insert(conn, PLAYLIST, track, "video1")
+    journal.complete_insert(conn, entry_id, "One video", "item1")
+
+    assert journal.replay(conn, PLAYLIST, no_live_items) == 1
+    row = conn.execute("SELECT * FROM history WHERE playlist = ?", (PLAYLIST,)).fetchone()
+    assert (row["spotify_id"], row["yt_title"], row["yt_playlist_item_id"], row["isrc"], row["duration_ms"]) == \
+        ("spotify:track:1", "One video", "item1", "ISRC1", 200000)
+    assert row["track_key"] == history_store.canonical_key("Artist", "One")
+    # the searches stay paid for, the rest of the journal is done with
+    assert journal.resolved_video_ids(conn, PLAYLIST) == {"spotify:track:1": "video1"}
+    assert conn.execute("SELECT COUNT(*) FROM journal WHERE op != 'search'").fetchone()[0] == 0
+
+
+def test_replay_skips_inserts_already_in_history(conn):
+    track = make_track("spotify:track:1", "One")
+    history_store.add_rows(conn, PLAYLIST, [track.history_row("One video", "item1")])
+    entry_id = journal.plan_insert(conn, PLAYLIST, track, "video1")
+    journal.complete_insert(conn, entry_id, "One video", "item1")
+
+    assert journal.replay(conn, PLAYLIST) == 0
+    assert conn.execute("SELECT COUNT(*) FROM history").fetchone()[0] == 1
+
+
+def test_replay_removes_finished_deletes(conn):
+    tracks = [make_track("spotify:track:1", "One"), make_track("spotify:track:2", "Two")]
+    history_store.add_rows(conn, PLAYLIST, [tracks[0].history_row("One video", "item1"),
+                                            tracks[1].history_row("Two video", "item2")])
+    history_store.start_diff(conn)
+    journal.plan_deletes(conn, PLAYLIST, history_store.removed_rows(conn, PLAYLIST))
+    journal.complete_delete(conn, PLAYLIST, "item1")
+
+    # the unfinished delete of item2 is left to the next diff
+    assert journal.replay(conn, PLAYLIST, no_live_items) == 1
+    assert history_items(conn) == {"item2"}
+
+
+def test_replay_looks_up_unfinished_inserts(conn):
+    found = make_track("spotify:track:1", "One")
+    lost = make_track("spotify:track:2", "Two")
+    journal.plan_insert(conn, PLAYLIST, found, "video1")
+    journal.plan_insert(conn, PLAYLIST, lost, "video2")
+
+    assert journal.replay(conn, PLAYLIST, lambda: {"video1": ("One video", "item1")}) == 1
+    assert history_items(conn) == {"item1"}
+    assert journal.is_empty(conn, PLAYLIST)
+
+
+def test_replay_does_not_reuse_recorded_items(conn):
+    track = make_track("spotify:track:1", "One")
+    history_store.add_rows(conn, PLAYLIST, [track.history_row("One video", "item1")])
+    journal.plan_insert(conn, PLAYLIST, make_track("spotify:track:2", "One again"), "video1")
+
+    assert journal.replay(conn, PLAYLIST, lambda: {"video1": ("One video", "item1")}) == 0
+    assert conn.execute("SELECT COUNT(*) FROM history").fetchone()[0] == 1
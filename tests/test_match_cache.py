@@ -0,0 +1,63 @@
+import pytest
+
+from spotify2youtube import match_cache
+from spotify2youtube.match_cache import MatchCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """ Set the time the cache sees with clock[0]."""
+    now = [1000.0]
+    monkeypatch.setattr(match_cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_get_by_spotify_id_or_normalized_title(tmp_path, clock):
+    cache = MatchCache(str(tmp_path / "cache.json"))
+    cache.put("The Band", "Song (feat. Someone)", "video1", "spotify:track:1")
+    assert cache.get("The Band", "Song (feat. Someone)", "spotify:track:1") == "video1"
+    assert cache.get("the band", "song", "spotify:track:relinked") == "video1"
+    assert cache.get("Other Band", "Song") is None
+
+
+def test_entries_expire_after_ttl(tmp_path, clock):
+    cache = MatchCache(str(tmp_path / "cache.json"), ttl=100)
+    cache.put("Artist", "Track", "video1", "spotify:track:1")
+    clock[0] += 100
+    assert cache.get("Artist", "Track", "spotify:track:1") == "video1"
+    clock[0] += 1
+    assert cache.get("Artist", "Track", "spotify:track:1") is None
+    assert len(cache) == 0
+
+
+def test_save_evicts_least_recently_used(tmp_path, clock):
+    path = str(tmp_path / "history" / "cache.json")
+    cache = MatchCache(path, max_entries=2)
+    for i in range(3):
+        cache.put("Artist", f"Track {i}", f"video{i}")
+        clock[0] += 1
+    cache.get("Artist", "Track 0")
+    cache.save()
+
+    saved = MatchCache(path)
+    assert len(saved) == 2
+    assert saved.get("Artist", "Track 0") == "video0"
+    assert saved.get("Artist", "Track 1") is None
+    assert saved.get("Artist", "Track 2") == "video2"
+
+
+def test_save_drops_expired_entries(tmp_path, clock):
+    path = str(tmp_path / "cache.json")
+    cache = MatchCache(path, ttl=100)
+    cache.put("Artist", "Old", "video1")
+    clock[0] += 150
+    cache.put("Artist", "New", "video2")
+    cache.save()
+    assert len(MatchCache(path)) == 1
+
+
+def test_invalidate(tmp_path, clock):
+    cache = MatchCache(str(tmp_path / "cache.json"))
+    cache.put("Artist", "Track", "video1", "spotify:track:1")
+    cache.invalidate("Artist", "Track", "spotify:track:1")
+    assert cache.get("Artist", "Track", "spotify:track:1") is None
@@ -0,0 +1,58 @@
+from spotify2youtube.planner import (CREATE_COST, DELETE_COST, INSERT_COST, SEARCH_COST, VIDEOS_COST,
+                                     Plan)
+
+from conftest import make_track
+
+
+def make_plan(known, searched, deletes=0, playlist_id="PL1", chunk_size=2):
+    """ Plan of known adds with a videoId followed by searched adds without, newest first."""
+    plan = Plan("playlist", playlist_id, chunk_size)
+    plan.adds = [(make_track(f"spotify:track:k{i}"), f"video{i}") for i in range(known)] + \
+                [(make_track(f"spotify:track:s{i}"), None) for i in range(searched)]
+    plan.deletes = [{"Spotify Id": f"spotify:track:d{i}"} for i in range(deletes)]
+    return plan
+
+
+def test_within_budget_keeps_everything_affordable():
+    plan = make_plan(known=2, searched=2, deletes=1)
+    budget = plan.cost()["total"]
+    plan.within_budget(budget)
+    assert (len(plan.adds), len(plan.deletes), plan.skipped_adds, plan.skipped_deletes) == (4, 1, 0, 0)
+
+
+def test_within_budget_drops_oldest_adds():
+    plan = make_plan(known=1, searched=3)
+    # the known insert, then the first search of its chunk pays for the chunk's videos.list
+    plan.within_budget(INSERT_COST + INSERT_COST + SEARCH_COST + VIDEOS_COST)
+    assert [track.spotify_id for track, video_id in plan.adds] == ["spotify:track:k0", "spotify:track:s0"]
+    assert plan.skipped_adds == 2
+
+
+def test_within_budget_charges_videos_list_once_per_chunk():
+    plan = make_plan(known=0, searched=2)
+    plan.within_budget(2 * (INSERT_COST + SEARCH_COST) + VIDEOS_COST)
+    assert len(plan.adds) == 2
+    plan = make_plan(known=0, searched=3)
+    plan.within_budget(3 * (INSERT_COST + SEARCH_COST) + VIDEOS_COST)
+    assert len(plan.adds) == 2
+
+
+def test_within_budget_gives_deletes_what_is_left():
+    plan = make_plan(known=1, searched=0, deletes=5)
+    plan.within_budget(INSERT_COST + 3 * DELETE_COST + DELETE_COST - 1)
+    assert (len(plan.adds), len(plan.deletes), plan.skipped_deletes) == (1, 3, 2)
+
+
+def test_within_budget_counts_planning_and_playlist_creation():
+    plan = make_plan(known=2, searched=0, playlist_id=None)
+    plan.planning_units = 7
+    plan.within_budget(7 + CREATE_COST + 2 * INSERT_COST - 1)
+    assert len(plan.adds) == 1
+    assert plan.cost()["total"] == 7 + CREATE_COST + INSERT_COST
+
+
+def test_within_budget_below_planning_drops_everything():
+    plan = make_plan(known=1, searched=1, deletes=1)
+    plan.planning_units = 10
+    plan.within_budget(5)
+    assert (plan.adds, plan.deletes, plan.skipped_adds, plan.skipped_deletes) == ([], [], 2, 1)
@@ -0,0 +1,66 @@
+import datetime
+import json
+
+import pytest
+
+from spotify2youtube import quota
+from spotify2youtube.quota import QuotaLedger, quota_day
+
+
+def utc(*args):
+    return datetime.datetime(*args, tzinfo=datetime.timezone.utc)
+
+
+@pytest.mark.parametrize("now, day", [
+    (utc(2024, 1, 2, 7, 59), "2024-01-01"),     # PST, UTC-8
+    (utc(2024, 1, 2, 8, 0), "2024-01-02"),
+    (utc(2024, 7, 2, 6, 59), "2024-07-01"),     # PDT, UTC-7
+    (utc(2024, 7, 2, 7, 0), "2024-07-02"),
+])
+def test_quota_day_is_pacific(now, day):
+    assert quota_day(now) == day
+
+
+@pytest.fixture
+def clients(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "client_secrets").mkdir()
+    for client in range(2):
+        (tmp_path / "client_secrets" / f"CLIENT_SECRET{client}.json").write_text("{}")
+
+
+@pytest.fixture
+def day(monkeypatch):
+    """ Set the current quota day with day[0]."""
+    today = ["2024-01-01"]
+    monkeypatch.setattr(quota, "quota_day", lambda now=None: today[0])
+    return today
+
+
+def test_ledger_rolls_over_at_the_quota_day(tmp_path, clients, day):
+    ledger = QuotaLedger(str(tmp_path / "ledger.json"), daily_quota=1000)
+    ledger.charge(0, "search.list")
+    ledger.charge(0, "playlistItems.insert")
+    ledger.mark_exhausted(1)
+    assert (ledger.remaining(0), ledger.remaining(1), ledger.available_clients()) == (850, 0, [0])
+
+    day[0] = "2024-01-02"
+    assert (ledger.remaining(0), ledger.remaining(1), ledger.available_clients()) == (1000, 1000, [0, 1])
+    assert ledger.used_total() == 0
+
+
+def test_ledger_is_saved_and_loaded(tmp_path, clients, day):
+    path = str(tmp_path / "client_secrets" / "quota_ledger.json")
+    ledger = QuotaLedger(path)
+    ledger.charge(1, "search.list")
+    ledger.save()
+    assert json.loads(open(path).read())["1"] == {"day": "2024-01-01", "units": {"search.list": 100},
+                                                  "exhausted": False}
+    assert QuotaLedger(path).used(1) == 100
+
+
+def test_ledger_cover(tmp_path, clients, day):
+    ledger = QuotaLedger(str(tmp_path / "ledger.json"), daily_quota=1000)
+    ledger.charge(0, "search.list")
+    assert ledger.cover(1500) == ([(0, 900), (1, 600)], 0)
+    assert ledger.cover(2500) == ([(0, 900), (1, 1000)], 600)
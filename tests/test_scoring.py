@@ -0,0 +1,55 @@
+from spotify2youtube import scoring
+
+from conftest import make_track
+
+
+def test_parse_duration():
+    assert scoring.parse_duration("PT3M25S") == 205
+    assert scoring.parse_duration("PT1H2S") == 3602
+    assert scoring.parse_duration("P1DT1M") == 86460
+    assert scoring.parse_duration("") is None
+
+
+def test_rank_prefers_topic_audio_of_the_right_length():
+    track = make_track("spotify:track:1", "Song Title", "The Band", duration_ms=200000)
+    candidates = [[("video", "The Band - Song Title (Official Video)", "TheBandVEVO"),
+                   ("audio", "Song Title", "The Band - Topic"),
+                   ("lyrics", "The Band - Song Title (Lyrics)", "Lyrics Channel")]]
+    details = {"video": (260, 10 ** 8), "audio": (201, 10 ** 5), "lyrics": (205, 10 ** 6)}
+    best, records = scoring.rank([track], candidates, details)
+    assert best == ["audio"]
+    assert [(video_id, chosen) for spotify_id, video_id, score, chosen in records] == \
+        [("video", 0), ("audio", 1), ("lyrics", 0)]
+
+
+def test_rank_scores_tracks_independently():
+    tracks = [make_track("spotify:track:1", "First", "A", duration_ms=100000),
+              make_track("spotify:track:2", "Second", "B", duration_ms=300000)]
+    candidates = [[("a1", "A - First", "A"), ("a2", "A - First", "A")],
+                  [("b1", "B - Second", "B"), ("b2", "B - Second", "B")]]
+    details = {"a1": (300, 100), "a2": (100, 100), "b1": (300, 100), "b2": (100, 100)}
+    best, records = scoring.rank(tracks, candidates, details)
+    assert best == ["a2", "b1"]
+    assert {spotify_id for spotify_id, video_id, score, chosen in records if chosen} == \
+        {"spotify:track:1", "spotify:track:2"}
+
+
+def test_rank_skips_candidates_without_details():
+    tracks = [make_track("spotify:track:1", "One"), make_track("spotify:track:2", "Two")]
+    candidates = [[("gone", "Artist - One", "Artist"), ("there", "Artist - One", "Artist")],
+                  [("deleted", "Artist - Two", "Artist")]]
+    best, records = scoring.rank(tracks, candidates, {"there": (200, 10)})
+    assert best == ["there", None]
+    assert [video_id for spotify_id, video_id, score, chosen in records] == ["there"]
+
+
+def test_rank_ties_go_to_the_first_candidate():
+    track = make_track("spotify:track:1", "One")
+    candidates = [[("first", "Artist - One", "Artist"), ("second", "Artist - One", "Artist")]]
+    best, records = scoring.rank([track], candidates, {"first": (200, 10), "second": (200, 10)})
+    assert best == ["first"]
+    assert [chosen for spotify_id, video_id, score, chosen in records] == [1, 0]
+
+
+def test_rank_without_candidates():
+    assert scoring.rank([make_track("spotify:track:1")], [[]], {}) == ([None], [])
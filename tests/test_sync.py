@@ -0,0 +1,49 @@
+from collections import Counter
+
+from spotify2youtube import history_store
+from spotify2youtube.sync import insert_position, load_spotify_secret
+
+from conftest import make_track
+
+PLAYLIST = "user-playlist-youtube"
+
+
+def add_history(conn, *tracks):
+    history_store.add_rows(conn, PLAYLIST, [track.history_row(track.name, f"item-{track.spotify_id}")
+                                            for track in tracks])
+
+
+def test_insert_position_below_newer_tracks(conn):
+    add_history(conn, make_track("spotify:track:1", added_date="20240301000000"),
+                make_track("spotify:track:2", added_date="20240101000000"))
+    track = make_track("spotify:track:3", added_date="20240201000000")
+    assert insert_position(conn, PLAYLIST, track, [], Counter(), newest_first=False) == 1
+    added = [make_track("spotify:track:4", added_date="20240215000000").history_row("4", "item-4")]
+    assert insert_position(conn, PLAYLIST, track, added, Counter(), newest_first=True) == 2
+
+
+def test_insert_position_of_leftovers_of_an_earlier_run(conn):
+    # an earlier budgeted run inserted the tracks added at the same time further down the playlist
+    add_history(conn, *(make_track(f"spotify:track:{i}") for i in range(3)))
+    leftover = make_track("spotify:track:leftover")
+    assert insert_position(conn, PLAYLIST, leftover, [], Counter(), newest_first=True) == 3
+    # a run streaming the playlist puts the tracks it inserts itself below the next one
+    inserted_by_run = [make_track("spotify:track:older").history_row("older", "item-older")]
+    assert insert_position(conn, PLAYLIST, leftover, inserted_by_run, Counter({leftover.added_date: 1}),
+                           newest_first=False) == 3
+    assert insert_position(conn, PLAYLIST, leftover, inserted_by_run, Counter({leftover.added_date: 1}),
+                           newest_first=True) == 4
+
+
+def test_insert_position_without_added_date(conn):
+    add_history(conn, make_track("spotify:track:1"))
+    assert insert_position(conn, PLAYLIST, make_track("spotify:track:2", added_date=None), [], Counter(),
+                           newest_first=False) == 0
+
+
+def test_load_spotify_secret_from_the_working_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "client_secrets").mkdir()
+    (tmp_path / "client_secrets" / "spotify_secret.py").write_text(
+        'spotify_client_id = "id"\nspotify_client_secret = "secret"\n')
+    assert load_spotify_secret() == ("id", "secret")
@@ -0,0 +1,102 @@
+import json
+
+import googleapiclient.errors
+import httplib2
+import pytest
+import requests
+import urllib3.exceptions
+
+from spotify2youtube import api
+from spotify2youtube import transport
+
+
+def http_error(status, reason=None):
+    content = json.dumps({"error": {"code": status, "errors": [{"reason": reason}] if reason else []}}).encode()
+    return googleapiclient.errors.HttpError(httplib2.Response({"status": status}), content)
+
+
+def refused_connection():
+    """ The ConnectionError requests raises when nothing listens on the port."""
+    reason = urllib3.exceptions.NewConnectionError(None, "Connection refused")
+    return requests.ConnectionError(urllib3.exceptions.MaxRetryError(None, "/", reason))
+
+
+@pytest.mark.parametrize("error, kind", [
+    (http_error(403, "quotaExceeded"), transport.QUOTA),
+    (http_error(403, "rateLimitExceeded"), transport.RATE_LIMIT),
+    (http_error(429), transport.RATE_LIMIT),
+    (http_error(503, "backendError"), transport.TRANSIENT),
+    (http_error(500), transport.TRANSIENT),
+    (http_error(400, "invalidValue"), transport.FATAL),
+    (http_error(404, "videoNotFound"), transport.FATAL),
+    (requests.ConnectionError(), transport.TRANSIENT),
+    (requests.ReadTimeout(), transport.TRANSIENT),
+])
+def test_classify(error, kind):
+    assert transport.classify(error) == kind
+
+
+def test_never_sent():
+    assert transport.never_sent(refused_connection())
+    assert transport.never_sent(requests.ConnectTimeout())
+    assert not transport.never_sent(requests.ReadTimeout())
+    assert not transport.never_sent(requests.ConnectionError("Connection reset by peer"))
+    assert not transport.never_sent(http_error(503))
+
+
+def test_should_retry():
+    assert transport.should_retry(transport.TRANSIENT, 0)
+    assert not transport.should_retry(transport.TRANSIENT, transport.MAX_RETRIES)
+    assert not transport.should_retry(transport.FATAL, 0)
+    assert not transport.should_retry(transport.QUOTA, 0)
+    # an insert that may have been applied is not sent again
+    assert not transport.should_retry(transport.TRANSIENT, 0, idempotent=False, error=http_error(503))
+    assert not transport.should_retry(transport.TRANSIENT, 0, idempotent=False, error=requests.ReadTimeout())
+    assert transport.should_retry(transport.TRANSIENT, 0, idempotent=False, error=refused_connection())
+    assert transport.should_retry(transport.RATE_LIMIT, 0, idempotent=False, error=http_error(429))
+
+
+class FakeRequest:
+    """ googleapiclient request failing with errors before it succeeds."""
+
+    def __init__(self, method_id, *errors):
+        self.methodId = method_id
+        self.errors = list(errors)
+        self.calls = 0
+
+    def execute(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return {"id": "item"}
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(transport, "backoff", lambda attempt, error=None: 0)
+
+
+def test_execute_retries_transient_list_errors():
+    request = FakeRequest("youtube.playlistItems.list", http_error(503, "backendError"), requests.ReadTimeout())
+    assert api.execute(request) == {"id": "item"}
+    assert request.calls == 3
+
+
+def test_execute_does_not_resend_inserts_that_may_have_been_applied():
+    request = FakeRequest("youtube.playlistItems.insert", http_error(503, "backendError"))
+    with pytest.raises(googleapiclient.errors.HttpError):
+        api.execute(request)
+    assert request.calls == 1
+
+
+def test_execute_resends_refused_inserts():
+    request = FakeRequest("youtube.playlistItems.insert", http_error(429), refused_connection())
+    assert api.execute(request) == {"id": "item"}
+    assert request.calls == 3
+
+
+def test_execute_raises_quota_exceeded():
+    request = FakeRequest("youtube.search.list", http_error(403, "quotaExceeded"))
+    with pytest.raises(api.QuotaExceeded):
+        api.execute(request)
+    assert request.calls == 1